@@ -1,25 +1,50 @@
+import atexit
 import os
 import io
+import hashlib
+import itertools
 import time
 import uuid
 import logging
+import logging.handlers
 import json
 import threading
+import multiprocessing
+import queue
+import random
 import re
-from xml.etree import ElementTree as ET
-from typing import Any, Callable, Dict, List, Optional, Tuple, Set
-from datetime import datetime, timedelta, timezone
-
-from flask import Flask, request, jsonify
+import tempfile
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Set
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import date, datetime, timedelta, timezone
+
+import httplib2
+import httpx
+import orjson
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from werkzeug.http import http_date
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 from googleapiclient.http import MediaIoBaseDownload
+from google_auth_httplib2 import AuthorizedHttp
 from openai import OpenAI
-from pymongo import MongoClient, UpdateOne, errors, ASCENDING, DESCENDING
+from pymongo import DeleteMany, InsertOne, MongoClient, ReturnDocument, UpdateOne, errors, ASCENDING, DESCENDING
 from bson import ObjectId
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover - lxml is optional; ElementTree has the same API subset
+    from xml.etree import ElementTree as ET
+    LXML_AVAILABLE = False
 
 from services.agent_tools import AgentExecutionError, AgentTool, run_agentic_session
 from services.analytics import TrendAnalyzer
@@ -34,6 +59,7 @@ from services.glpi_service import (
 from pypdf import PdfReader
 from services.knowledge_pipeline import KnowledgePipeline
 from services.rag_pipeline import HybridRAGPipeline
+from services.rag_utils import embedding_storage_fields, resolve_embedding
 from services.ticket_router import TicketRouter
 from services.docling_service import create_docling_converter
 
@@ -50,21 +76,69 @@ def _env_bool(name: str, default: str = "false") -> bool:
 load_dotenv()
 
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Request threads only enqueue log records; a single listener thread does the formatting
+# and stream writes, so handler locks are never contended on the request path.
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL, logging.INFO),
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.getLogger("googleapiclient.discovery").setLevel(logging.WARNING)
 
+# orjson options shared by the JSON provider and the streamed JSON responses. Dates are
+# passed through to orjson_default so they keep Flask's HTTP-date form.
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def orjson_default(obj: Any) -> str:
+    """Render dates as Flask's default provider did; ObjectIds and the rest fall back to str()."""
+    if isinstance(obj, date):
+        return http_date(obj)
+    return str(obj)
+
+
+class ORJSONProvider(JSONProvider):
+    """Serialize responses with orjson, keeping the output of Flask's default provider."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTIONS).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Hand orjson's bytes straight to the response instead of decoding them to
+        # str in dumps() only for Werkzeug to encode them again.
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype="application/json")
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
 MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME") or os.environ.get("MONGO_DB", "obvix_lake")
-mongo_client = MongoClient(
-    MONGO_URI,
-    serverSelectionTimeoutMS=int(os.environ.get("MONGO_TIMEOUT_MS", "5000")),
-)
+# One client per process, shared by the request handlers, background workers and services.
+_mongo_client_options: Dict[str, Any] = {
+    "serverSelectionTimeoutMS": int(os.environ.get("MONGO_TIMEOUT_MS", "5000")),
+    "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", "50")),
+    # Keep a few warm sockets so request bursts do not pay for new connections.
+    "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", "10")),
+    "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "300000")),
+}
+if os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"):
+    _mongo_client_options["waitQueueTimeoutMS"] = int(os.environ["MONGO_WAIT_QUEUE_TIMEOUT_MS"])
+if os.environ.get("MONGO_COMPRESSORS"):
+    # e.g. "zstd,snappy"; needs the matching compression package installed.
+    _mongo_client_options["compressors"] = os.environ["MONGO_COMPRESSORS"]
+mongo_client = MongoClient(MONGO_URI, **_mongo_client_options)
 db = mongo_client[MONGO_DB_NAME]
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -72,19 +146,42 @@ if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY environment variable must be set.")
 
 OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL")
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "50"))
+OPENAI_HTTP_TIMEOUT_SECONDS = float(os.environ.get("OPENAI_HTTP_TIMEOUT_SECONDS", "60"))
+# One pooled HTTP client shared by every thread so parallel embedding, router and
+# completion calls reuse warm TLS connections.
+openai_http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    ),
+    timeout=OPENAI_HTTP_TIMEOUT_SECONDS,
+)
 if OPENAI_BASE_URL:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+    openai_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, http_client=openai_http_client)
 else:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    openai_client = OpenAI(api_key=OPENAI_API_KEY, http_client=openai_http_client)
 
 CHAT_MODEL = os.environ.get("CHAT_MODEL", "gpt-4o-mini")
 EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-large")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_WORKERS = int(os.environ.get("EMBEDDING_WORKERS", "4"))
+EMBEDDING_STORE_INT8 = _env_bool("EMBEDDING_STORE_INT8", "true")
 RAG_JUDGE_MODEL = os.environ.get("RAG_JUDGE_MODEL", "gpt-4o-mini")
 LLM_TEMP_LOW = float(os.environ.get("LLM_TEMP_LOW", "0.2"))
 MAX_EMBED_CHARS = int(os.environ.get("MAX_EMBED_CHARS", "1200"))
 MIN_ASSIST_TURNS = int(os.environ.get("MIN_ASSIST_TURNS", "2"))
 MAX_ASSIST_TURNS = int(os.environ.get("MAX_ASSIST_TURNS", "4"))
 MAX_HISTORY_MESSAGES_TO_RETRIEVE = int(os.environ.get("MAX_HISTORY_MESSAGES", "16"))
+CHAT_STREAM_WORKERS = int(os.environ.get("CHAT_STREAM_WORKERS", "8"))
+# The in-process history cache is only coherent when a user's turns always reach the same
+# process (a single worker, or sticky routing by user), so it is opt-in.
+CHAT_HISTORY_CACHE_ENABLED = _env_bool("CHAT_HISTORY_CACHE_ENABLED", "false")
+CHAT_HISTORY_CACHE_MAX_USERS = int(os.environ.get("CHAT_HISTORY_CACHE_MAX_USERS", "2048"))
+CHAT_HISTORY_CACHE_DEPTH = max(64, MAX_HISTORY_MESSAGES_TO_RETRIEVE)
+PERSONA_CONTEXT_TTL_SECONDS = int(os.environ.get("PERSONA_CONTEXT_TTL_SECONDS", "60"))
+PERSONA_CONTEXT_CACHE_MAX_ENTRIES = int(os.environ.get("PERSONA_CONTEXT_CACHE_MAX_ENTRIES", "256"))
 
 PERSONA_COLLECTION_PREFIX = os.environ.get("PERSONA_COLLECTION_PREFIX", "persona_")
 DEFAULT_SUPPORT_PERSONA = os.environ.get("DEFAULT_SUPPORT_PERSONA", "ol_support")
@@ -100,12 +197,23 @@ GLPI_SYNC_STATE_COL = os.environ.get("GLPI_SYNC_STATE_COL", "glpi_sync_state")
 GLPI_RAW_TICKETS_COL = os.environ.get("GLPI_RAW_TICKETS_COL", "glpi_tickets")
 GLPI_RESOLUTIONS_COL = os.environ.get("GLPI_RESOLUTIONS_COL", "glpi_resolutions")
 ANALYTICS_CLUSTERS_COL = os.environ.get("ANALYTICS_CLUSTERS_COL", "analytics_clusters")
+PERSONA_INDEX_COL = os.environ.get("PERSONA_INDEX_COL", "persona_index")
+DRIVE_SYNC_STATE_COL = os.environ.get("DRIVE_SYNC_STATE_COL", "drive_sync_state")
+DRIVE_PROCESSED_FILES_COL = os.environ.get("DRIVE_PROCESSED_FILES_COL", "drive_processed_files")
 
 KNOWLEDGE_AUTO_APPROVE = _env_bool("KNOWLEDGE_AUTO_APPROVE", "true")
 KNOWLEDGE_PIPELINE_INTERVAL_SECONDS = int(os.environ.get("KNOWLEDGE_PIPELINE_INTERVAL_SECONDS", "60"))
 ANALYTICS_REFRESH_INTERVAL_SECONDS = int(os.environ.get("ANALYTICS_REFRESH_INTERVAL_SECONDS", "900"))
 METRICS_REFRESH_INTERVAL_SECONDS = int(os.environ.get("METRICS_REFRESH_INTERVAL_SECONDS", "900"))
 GLPI_SYNC_INTERVAL_SECONDS = int(os.environ.get("GLPI_SYNC_INTERVAL_SECONDS", "1800"))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.environ.get("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+GLPI_TICKET_STATUS_CACHE_TTL_SECONDS = int(os.environ.get("GLPI_TICKET_STATUS_CACHE_TTL_SECONDS", "15"))
+GLPI_TICKET_STATUS_CACHE_MAX_ENTRIES = int(os.environ.get("GLPI_TICKET_STATUS_CACHE_MAX_ENTRIES", "4096"))
+KNOWLEDGE_PIPELINE_MIN_INTERVAL_SECONDS = int(os.environ.get("KNOWLEDGE_PIPELINE_MIN_INTERVAL_SECONDS", "5"))
+METRICS_MIN_INTERVAL_SECONDS = int(os.environ.get("METRICS_MIN_INTERVAL_SECONDS", "60"))
+DRIVE_SYNC_INTERVAL_SECONDS = int(os.environ.get("DRIVE_SYNC_INTERVAL_SECONDS", "60"))
+DRIVE_SYNC_MIN_INTERVAL_SECONDS = int(os.environ.get("DRIVE_SYNC_MIN_INTERVAL_SECONDS", "5"))
+DRIVE_SYNC_MAX_INTERVAL_SECONDS = int(os.environ.get("DRIVE_SYNC_MAX_INTERVAL_SECONDS", "300"))
 
 RAG_TOP_K = int(os.environ.get("RAG_TOP_K", "5"))
 RAG_MAX_CANDIDATES = int(os.environ.get("RAG_MAX_CANDIDATES", "400"))
@@ -113,8 +221,42 @@ RAG_BM25_WEIGHT = float(os.environ.get("RAG_BM25_WEIGHT", "0.40"))
 RAG_SEMANTIC_WEIGHT = float(os.environ.get("RAG_SEMANTIC_WEIGHT", "0.60"))
 
 PERSONA_FOLDER_LOCK = threading.Lock()
+chat_stream_executor = ThreadPoolExecutor(max_workers=CHAT_STREAM_WORKERS, thread_name_prefix="chat_stream")
+# Runs independent Mongo writes of one request side by side.
+db_write_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("DB_WRITE_WORKERS", "8")), thread_name_prefix="db_write"
+)
+# Small files are latency-bound, so they get a wide pool; large downloads share a narrow
+# pool so they don't starve each other of bandwidth.
+DRIVE_SYNC_WORKERS = int(os.environ.get("DRIVE_SYNC_WORKERS", "16"))
+DRIVE_SYNC_LARGE_WORKERS = int(os.environ.get("DRIVE_SYNC_LARGE_WORKERS", "4"))
+DRIVE_LARGE_FILE_BYTES = int(os.environ.get("DRIVE_LARGE_FILE_BYTES", str(10 * 1024 * 1024)))
+drive_sync_executor = ThreadPoolExecutor(max_workers=DRIVE_SYNC_WORKERS, thread_name_prefix="drive_sync")
+drive_sync_large_executor = ThreadPoolExecutor(
+    max_workers=DRIVE_SYNC_LARGE_WORKERS, thread_name_prefix="drive_sync_large"
+)
+# Docling files queue on their own pool sized to the conversion slots (plus one download
+# in flight), so a folder full of PDFs waits in the queue instead of parking threads on
+# the converter and starving plain-text files.
+DOCLING_MAX_CONCURRENT_CONVERSIONS = int(os.environ.get("DOCLING_MAX_CONCURRENT_CONVERSIONS", "1"))
+docling_sync_executor = ThreadPoolExecutor(
+    max_workers=max(1, DOCLING_MAX_CONCURRENT_CONVERSIONS) + 1, thread_name_prefix="docling_sync"
+)
+# Kept apart from the Drive pools: its tasks block on Drive extraction futures.
+embedding_executor = ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS, thread_name_prefix="embedding")
 PERSONA_FOLDER_INDEX: Dict[str, str] = {}
+# folder_id -> (modifiedTime, has_profile, child folders as (id, name, modifiedTime), cached_at)
+_persona_scan_cache: Dict[str, Tuple[str, bool, List[Tuple[str, str, str]], float]] = {}
+_persona_scan_cache_lock = threading.Lock()
 PDF_MIME_TYPES = {"application/pdf"}
+PDF_EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "5"))
+PDF_EXTRACT_TIMEOUT_SECONDS = int(os.environ.get("PDF_EXTRACT_TIMEOUT_SECONDS", "120"))
+DOCLING_MIME_EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "application/msword": ".doc",
+}
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 GOOGLE_SERVICE_ACCOUNT_FILE = (
@@ -132,7 +274,31 @@ drive_credentials = service_account.Credentials.from_service_account_file(
     GOOGLE_SERVICE_ACCOUNT_FILE,
     scopes=GOOGLE_SCOPES,
 )
-drive_service = build("drive", "v3", credentials=drive_credentials)
+DRIVE_HTTP_TIMEOUT_SECONDS = int(os.environ.get("DRIVE_HTTP_TIMEOUT_SECONDS", "30"))
+DRIVE_DOWNLOAD_CHUNK_BYTES = int(os.environ.get("DRIVE_DOWNLOAD_CHUNK_BYTES", str(16 * 1024 * 1024)))
+DRIVE_NUM_RETRIES = int(os.environ.get("DRIVE_NUM_RETRIES", "5"))
+# Google rejects large batches with 500s; keep well under the documented 100-call cap.
+DRIVE_BATCH_MAX_REQUESTS = int(os.environ.get("DRIVE_BATCH_MAX_REQUESTS", "25"))
+# Persona folders per files().list query; keeps the OR-ed parents clause well under Drive's query size limit.
+DRIVE_LIST_FOLDERS_PER_QUERY = max(1, int(os.environ.get("DRIVE_LIST_FOLDERS_PER_QUERY", "40")))
+DRIVE_FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# A folder holding one of these files is a persona; these documents carry its settings.
+PERSONA_PROFILE_FILENAMES = frozenset({"profile.txt", "profile.xml"})
+PERSONA_SETTINGS_DOC_NAMES = frozenset({"profile", "common_phrases"})
+PERSONA_SCAN_CACHE_TTL_SECONDS = int(os.environ.get("PERSONA_SCAN_CACHE_TTL_SECONDS", "900"))
+# Safety net for anything the change feed can't attribute to a persona folder.
+DRIVE_FULL_SYNC_INTERVAL_SECONDS = int(os.environ.get("DRIVE_FULL_SYNC_INTERVAL_SECONDS", "3600"))
+_drive_local = threading.local()
+
+
+def get_drive_service():
+    """Return this thread's Drive client; httplib2 connections are not thread-safe."""
+    service = getattr(_drive_local, "service", None)
+    if service is None:
+        http = AuthorizedHttp(drive_credentials, http=httplib2.Http(timeout=DRIVE_HTTP_TIMEOUT_SECONDS))
+        service = build("drive", "v3", http=http, cache_discovery=False)
+        _drive_local.service = service
+    return service
 
 WATCH_FOLDER_ID = (
     os.environ.get("WATCH_FOLDER_ID")
@@ -154,6 +320,32 @@ def build_embeddings(texts: List[str]) -> List[List[float]]:
     return [item.embedding for item in response.data]
 
 
+def build_embeddings_batched(texts: List[str]) -> List[List[float]]:
+    """Embed any number of texts in requests of at most EMBEDDING_BATCH_SIZE inputs."""
+    vectors: List[List[float]] = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        vectors.extend(build_embeddings(texts[start:start + EMBEDDING_BATCH_SIZE]))
+    return vectors
+
+
+def _embed_texts(
+    texts: List[str],
+    precomputed: Optional[Dict[str, List[float]]] = None,
+) -> List[List[float]]:
+    # Serve vectors from a sync-wide batch when available; embed only the misses.
+    if not precomputed:
+        return build_embeddings_batched(texts)
+    missing = [text for text in dict.fromkeys(texts) if text not in precomputed]
+    if missing:
+        precomputed = {**precomputed, **dict(zip(missing, build_embeddings_batched(missing)))}
+    return [precomputed.get(text) for text in texts]
+
+
+def _embedding_storage(embedding: Optional[List[float]]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Return ($set, $unset) fields for storing a chunk embedding (int8-packed unless disabled)."""
+    return embedding_storage_fields(embedding, EMBEDDING_STORE_INT8)
+
+
 def short_completion(system_prompt: str, user_prompt: str, max_tokens: int = 120) -> str:
     try:
         response = openai_client.chat.completions.create(
@@ -188,6 +380,8 @@ docling_converter = create_docling_converter(
     max_chunk_tokens=int(os.environ.get("DOCLING_MAX_CHUNK_TOKENS", "512")),
     preserve_tables=_env_bool("DOCLING_PRESERVE_TABLES", "true"),
     preserve_formatting=_env_bool("DOCLING_PRESERVE_FORMATTING", "true"),
+    max_concurrent_conversions=DOCLING_MAX_CONCURRENT_CONVERSIONS,
+    cache_dir=os.environ.get("DOCLING_CACHE_DIR", os.path.join(BASE_DIR, "cache", "docling")),
 )
 
 
@@ -201,67 +395,104 @@ GLPI_ENABLED = bool(GLPI_HOST and GLPI_APP_TOKEN and GLPI_API_TOKEN)
 # ==============================================================================
 # DRIVE HELPERS
 # ==============================================================================
+def _download_drive_media(request_, fh) -> None:
+    downloader = MediaIoBaseDownload(fh, request_, chunksize=DRIVE_DOWNLOAD_CHUNK_BYTES)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk(num_retries=DRIVE_NUM_RETRIES)
+
+
+@contextmanager
+def _download_drive_media_to_tempfile(request_, suffix: str):
+    """Stream a Drive download to a temporary file and yield its path.
+
+    Keeps large documents out of memory; the file is removed on exit.
+    """
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+        try:
+            _download_drive_media(request_, tmp_file)
+        except Exception:
+            tmp_file.close()
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    try:
+        yield tmp_path
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+_TEXTLIKE_APPLICATION_MIME_TYPES = frozenset({
+    "application/xml",
+    "application/json",
+    "application/x-yaml",
+    "application/yaml",
+})
+
+
+def _is_textlike_mime(mime_type: str) -> bool:
+    return (
+        "google-apps" in mime_type
+        or mime_type.startswith("text/")
+        or mime_type in _TEXTLIKE_APPLICATION_MIME_TYPES
+        or mime_type in DOCLING_MIME_EXTENSIONS
+    )
+
+
 def fetch_plain_text(file_id: str, mime_type: str) -> str:
     """Fetch and extract text from Google Drive files.
     
     For PDFs and supported document types, uses Docling for advanced extraction
     with structure preservation. Falls back to simple text extraction for other types.
     """
+    if not _is_textlike_mime(mime_type):
+        # Images, archives, media, etc. would only decode to noise; skip the download.
+        logging.info("Skipping file %s with unsupported MIME type %s", file_id, mime_type)
+        return ""
     try:
-        request_ = (
-            drive_service.files().export_media(fileId=file_id, mimeType="text/plain")
-            if "google-apps" in mime_type
-            else drive_service.files().get_media(fileId=file_id)
-        )
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request_)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        binary_data = fh.getvalue()
-        
         # For Google Docs, just decode as text
         if "google-apps" in mime_type:
-            return binary_data.decode("utf-8", errors="ignore")
-        
+            fh = io.BytesIO()
+            _download_drive_media(
+                get_drive_service().files().export_media(fileId=file_id, mimeType="text/plain"), fh
+            )
+            return fh.getvalue().decode("utf-8", errors="ignore")
+
+        request_ = get_drive_service().files().get_media(fileId=file_id)
+
         # For PDFs and other document types, use Docling for advanced extraction
-        if mime_type in PDF_MIME_TYPES or mime_type in {
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # DOCX
-            "application/msword",  # DOC
-        }:
-            docling_text = _extract_with_docling(binary_data, mime_type, file_id)
-            if docling_text:
-                return docling_text
-            # Fallback to simple PDF extraction if Docling fails
-            if mime_type in PDF_MIME_TYPES:
-                pdf_text = _extract_pdf_text(binary_data, file_id)
-                if pdf_text:
-                    return pdf_text
-        
+        if mime_type in DOCLING_MIME_EXTENSIONS:
+            with _download_drive_media_to_tempfile(request_, DOCLING_MIME_EXTENSIONS[mime_type]) as tmp_path:
+                docling_text = _extract_with_docling(tmp_path, mime_type, file_id)
+                if docling_text:
+                    return docling_text
+                return _text_from_downloaded_file(tmp_path, mime_type, file_id)
+
         # Default: decode as text
-        return binary_data.decode("utf-8", errors="ignore")
+        fh = io.BytesIO()
+        _download_drive_media(request_, fh)
+        return fh.getvalue().decode("utf-8", errors="ignore")
     except Exception as e:
-        logging.error(f"Failed to fetch text for file {file_id}: {e}")
+        logging.error("Failed to fetch text for file %s: %s", file_id, e)
         return ""
 
 
-def _extract_with_docling(data: bytes, mime_type: str, file_id: str) -> str:
-    """Extract text from document using Docling with structure preservation."""
-    if not data:
-        return ""
-    
+def _text_from_downloaded_file(file_path: str, mime_type: str, file_id: str) -> str:
+    """Non-Docling text for an already downloaded document: PyPDF for PDFs, else a raw decode."""
+    if mime_type in PDF_MIME_TYPES:
+        pdf_text = _extract_pdf_text(file_path, file_id)
+        if pdf_text:
+            return pdf_text
+    return Path(file_path).read_bytes().decode("utf-8", errors="ignore")
+
+
+def _extract_with_docling(file_path: str, mime_type: str, file_id: str) -> str:
+    """Extract text from a downloaded document using Docling with structure preservation."""
     try:
-        # Determine file extension from MIME type
-        ext_map = {
-            "application/pdf": ".pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
-            "application/msword": ".doc",
-        }
-        extension = ext_map.get(mime_type, ".pdf")
-        filename = f"{file_id}{extension}"
+        filename = f"{file_id}{DOCLING_MIME_EXTENSIONS.get(mime_type, '.pdf')}"
         
         # Convert to Docling document
-        docling_doc = docling_converter.convert_bytes_to_docling(data, mime_type, filename)
+        docling_doc = docling_converter.convert_file_to_docling(file_path, filename)
         if not docling_doc:
             logging.warning("Docling conversion failed for %s, will try fallback", file_id)
             return ""
@@ -277,25 +508,117 @@ def _extract_with_docling(data: bytes, mime_type: str, file_id: str) -> str:
         return ""
 
 
-def _extract_pdf_text(data: bytes, file_id: str) -> str:
-    if not data:
-        return ""
+_pdf_extract_pool: Optional[ProcessPoolExecutor] = None
+_pdf_extract_pool_lock = threading.Lock()
+
+
+def _init_pdf_extract_worker() -> None:
+    # The fork copies the parent's QueueHandler, whose queue lock another thread may have
+    # held at fork time; give the child its own stderr handler so pypdf's logging cannot
+    # block on it.
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+    root.addHandler(stream_handler)
+
+
+def _get_pdf_extract_pool() -> ProcessPoolExecutor:
+    global _pdf_extract_pool
+    with _pdf_extract_pool_lock:
+        if _pdf_extract_pool is None:
+            # Fork so workers inherit the already-imported parser; spawn/forkserver would
+            # re-import this module (and its clients) in every worker.
+            _pdf_extract_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_pdf_extract_worker,
+            )
+        return _pdf_extract_pool
+
+
+def _discard_pdf_extract_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker that missed its deadline may never return; stop handing work to its pool.
+    global _pdf_extract_pool
+    with _pdf_extract_pool_lock:
+        if _pdf_extract_pool is pool:
+            _pdf_extract_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pdf_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str, Optional[str]]]:
+    # Runs in a worker process: return errors instead of logging from the child.
+    reader = PdfReader(pdf_path)
+    results: List[Tuple[int, str, Optional[str]]] = []
+    for idx in range(start, stop):
+        try:
+            results.append((idx, reader.pages[idx].extract_text() or "", None))
+        except Exception as exc:  # pragma: no cover - defensive
+            results.append((idx, "", str(exc)))
+    return results
+
+
+def _iter_pdf_page_results(reader, pdf_path: str, file_id: str) -> Iterator[Tuple[int, str, Optional[str]]]:
+    page_count = len(reader.pages)
+    next_idx = 0
+    workers = min(PDF_EXTRACT_WORKERS, page_count)
+    if workers > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+        # Pages are independent and pypdf holds the GIL, so hand contiguous
+        # page ranges to worker processes (each opens the file once).
+        step = -(-page_count // workers)
+        pool = _get_pdf_extract_pool()
+        try:
+            futures = [
+                pool.submit(_extract_pdf_page_range, pdf_path, start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            ]
+            for future in futures:
+                for result in future.result(timeout=PDF_EXTRACT_TIMEOUT_SECONDS):
+                    yield result
+                    next_idx = result[0] + 1
+        except FutureTimeoutError:
+            logging.warning(
+                "Parallel PDF extraction timed out for %s after %ss; continuing serially",
+                file_id,
+                PDF_EXTRACT_TIMEOUT_SECONDS,
+            )
+            _discard_pdf_extract_pool(pool)
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.warning("Parallel PDF extraction failed for %s: %s; continuing serially", file_id, exc)
+    for idx in range(next_idx, page_count):
+        try:
+            yield idx, reader.pages[idx].extract_text() or "", None
+        except Exception as exc:  # pragma: no cover - defensive
+            yield idx, "", str(exc)
+
+
+_NUL_TRANSLATION = str.maketrans("", "", "\x00")
+
+
+def _iter_pdf_pages(pdf_path: str, file_id: str) -> Iterator[str]:
+    """Yield the cleaned, non-empty text of each PDF page in order."""
     try:
-        reader = PdfReader(io.BytesIO(data))
+        reader = PdfReader(pdf_path)
     except Exception as exc:
         logging.warning("Unable to read PDF %s: %s", file_id, exc)
-        return ""
-    pages: List[str] = []
-    for idx, page in enumerate(reader.pages):
-        try:
-            text = page.extract_text() or ""
-        except Exception as exc:  # pragma: no cover - defensive
-            logging.warning("Failed to extract text from PDF %s page %s: %s", file_id, idx, exc)
-            text = ""
-        cleaned = text.replace("\u0000", "").strip()
+        return
+    for idx, text, error in _iter_pdf_page_results(reader, pdf_path, file_id):
+        if error:
+            logging.warning("Failed to extract text from PDF %s page %s: %s", file_id, idx, error)
+        cleaned = text.translate(_NUL_TRANSLATION).strip()
         if cleaned:
-            pages.append(cleaned)
-    combined = "\n\n".join(pages).strip()
+            yield cleaned
+
+
+def _extract_pdf_text(pdf_path: str, file_id: str) -> str:
+    # Pages are written straight into one buffer instead of being held as a list first.
+    buffer = io.StringIO()
+    for page_text in _iter_pdf_pages(pdf_path, file_id):
+        if buffer.tell():
+            buffer.write("\n\n")
+        buffer.write(page_text)
+    combined = buffer.getvalue()
     if not combined:
         logging.info("PDF %s produced no extractable text; skipping.", file_id)
     return combined
@@ -311,10 +634,7 @@ def fetch_and_chunk_with_docling(file_id: str, mime_type: str, filename: str) ->
     
     try:
         # Only use Docling for supported document types
-        if mime_type not in PDF_MIME_TYPES and mime_type not in {
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "application/msword",
-        }:
+        if mime_type not in DOCLING_MIME_EXTENSIONS:
             # For other types, use standard text extraction
             logging.info("File %s (type %s) not supported by Docling, using standard extraction", filename, mime_type)
             text = fetch_plain_text(file_id, mime_type)
@@ -323,43 +643,44 @@ def fetch_and_chunk_with_docling(file_id: str, mime_type: str, filename: str) ->
         
         logging.info("Starting Docling chunking for %s (type: %s)", filename, mime_type)
         
-        # Fetch file bytes
-        request_ = drive_service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request_)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        binary_data = fh.getvalue()
-        
-        if not binary_data:
-            logging.warning("No data retrieved for file %s", file_id)
-            return []
-        
-        logging.info("Retrieved %d bytes for %s", len(binary_data), filename)
-        
-        # Convert to Docling document
-        docling_doc = docling_converter.convert_bytes_to_docling(binary_data, mime_type, filename)
-        if not docling_doc:
-            logging.warning("Docling conversion failed for %s, using fallback chunking", filename)
-            text = fetch_plain_text(file_id, mime_type)
-            simple_chunks = _split_text_for_embeddings(text)
-            return [{"content": chunk, "metadata": {"filename": filename}} for chunk in simple_chunks]
-        
-        logging.info("Docling conversion successful for %s, starting chunking", filename)
-        
-        # Get semantic chunks from Docling
-        # Note: Docling v2+ uses text export internally, not page.elements
-        doc_chunks = docling_converter.chunk_docling_document(docling_doc, filename)
-        
-        if not doc_chunks:
-            logging.error("Docling chunking returned 0 chunks for %s! Using PyPDF fallback", filename)
-            # Ultimate fallback to PyPDF
-            text = fetch_plain_text(file_id, mime_type)
-            if text:
+        # Stream the file to disk so Docling reads it from a path instead of a memory buffer
+        request_ = get_drive_service().files().get_media(fileId=file_id)
+        suffix = Path(filename).suffix or DOCLING_MIME_EXTENSIONS[mime_type]
+        with _download_drive_media_to_tempfile(request_, suffix) as tmp_path:
+            file_size = os.path.getsize(tmp_path)
+            if not file_size:
+                logging.warning("No data retrieved for file %s", file_id)
+                return []
+            
+            logging.info("Retrieved %d bytes for %s", file_size, filename)
+            content_hash = docling_converter.file_sha256(tmp_path)
+            
+            # Convert to Docling document (reused from cache when the bytes are unchanged)
+            docling_doc = docling_converter.convert_file_to_docling(tmp_path, filename, content_hash=content_hash)
+            
+            # Fallbacks below reuse the downloaded file instead of fetching it from Drive again
+            if not docling_doc:
+                logging.warning("Docling conversion failed for %s, using fallback chunking", filename)
+                text = _text_from_downloaded_file(tmp_path, mime_type, file_id)
                 simple_chunks = _split_text_for_embeddings(text)
                 return [{"content": chunk, "metadata": {"filename": filename}} for chunk in simple_chunks]
-            return []
+            
+            logging.info("Docling conversion successful for %s, starting chunking", filename)
+            
+            # Get semantic chunks from Docling
+            # Note: Docling v2+ uses text export internally, not page.elements
+            doc_chunks = docling_converter.chunk_docling_document(docling_doc, filename)
+            
+            if not doc_chunks:
+                logging.error("Docling chunking returned 0 chunks for %s! Using PyPDF fallback", filename)
+                # Ultimate fallback: Docling's plain text export, then PyPDF
+                text = docling_converter.extract_text_from_docling(docling_doc) or _text_from_downloaded_file(
+                    tmp_path, mime_type, file_id
+                )
+                if text:
+                    simple_chunks = _split_text_for_embeddings(text)
+                    return [{"content": chunk, "metadata": {"filename": filename}} for chunk in simple_chunks]
+                return []
         
         # Merge very small chunks
         original_count = len(doc_chunks)
@@ -371,6 +692,7 @@ def fetch_and_chunk_with_docling(file_id: str, mime_type: str, filename: str) ->
             chunk_metadata = dict(chunk.metadata)
             chunk_metadata["chunk_type"] = chunk.chunk_type
             chunk_metadata["position"] = chunk.position
+            chunk_metadata["content_hash"] = content_hash
             
             # Add heading context
             if chunk.heading_hierarchy:
@@ -405,12 +727,15 @@ def _parse_key_value_doc(text_content: str) -> Dict[str, Any]:
     return profile_data
 
 
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+
 def _split_text_for_embeddings(text: str, max_chars: int = MAX_EMBED_CHARS) -> List[str]:
     text = (text or "").strip()
     if not text:
         return []
 
-    paragraphs = re.split(r"\n\s*\n", text)
+    paragraphs = [para for para in (part.strip() for part in _PARAGRAPH_BREAK_RE.split(text)) if para]
     chunks: List[str] = []
     current: List[str] = []
     current_length = 0
@@ -424,21 +749,20 @@ def _split_text_for_embeddings(text: str, max_chars: int = MAX_EMBED_CHARS) -> L
         current = []
         current_length = 0
 
-    for paragraph in paragraphs:
-        para = paragraph.strip()
-        if not para:
-            continue
-        if len(para) > max_chars:
+    for para in paragraphs:
+        para_length = len(para)
+        if para_length > max_chars:
             _flush_current()
-            for idx in range(0, len(para), max_chars):
-                segment = para[idx : idx + max_chars].strip()
-                if segment:
-                    chunks.append(segment)
+            chunks.extend(
+                segment
+                for segment in (para[idx : idx + max_chars].strip() for idx in range(0, para_length, max_chars))
+                if segment
+            )
             continue
-        if current_length + len(para) + (2 if current else 0) > max_chars:
+        if current_length + para_length + (2 if current else 0) > max_chars:
             _flush_current()
         current.append(para)
-        current_length += len(para) + (2 if current_length else 0)
+        current_length += para_length + (2 if current_length else 0)
 
     _flush_current()
 
@@ -471,11 +795,16 @@ def _prepare_knowledge_segments(
     return segments
 
 
+_XML_KEY_NON_ALNUM_RE = re.compile(r"[^0-9A-Za-z]+")
+_XML_KEY_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+
+
+@lru_cache(maxsize=1024)
 def _xml_key_to_snake_case(value: Optional[str]) -> str:
     if not value:
         return ""
-    interim = re.sub(r"([^0-9A-Za-z]+)", "_", value)
-    interim = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", interim)
+    interim = _XML_KEY_NON_ALNUM_RE.sub("_", value)
+    interim = _XML_KEY_CAMEL_RE.sub(r"\1_\2", interim)
     return interim.strip("_").lower()
 
 
@@ -486,6 +815,8 @@ def _collect_profile_settings(node: ET.Element, settings: Dict[str, Any]) -> Non
         if key_self and value_self:
             settings[key_self] = value_self
     for element in list(node):
+        if not isinstance(element.tag, str):  # Skip comments/processing instructions
+            continue
         tag = element.tag.lower()
         if tag in {"phrases", "knowledge"}:
             continue
@@ -501,9 +832,17 @@ def _collect_profile_settings(node: ET.Element, settings: Dict[str, Any]) -> Non
                 settings[sub_key] = sub_text
 
 
+def _parse_xml_document(text_content: str):
+    # Parse from bytes so documents with an encoding declaration work under lxml too.
+    data = text_content.encode("utf-8")
+    if LXML_AVAILABLE:
+        return ET.fromstring(data, ET.XMLParser(resolve_entities=False, no_network=True))
+    return ET.fromstring(data)
+
+
 def _parse_persona_profile_xml(text_content: str) -> Tuple[Dict[str, Any], List[str], List[Dict[str, Any]]]:
     try:
-        root = ET.fromstring(text_content)
+        root = _parse_xml_document(text_content)
     except ET.ParseError as exc:  # pragma: no cover - Input validation
         raise ValueError(f"Invalid persona XML: {exc}") from exc
 
@@ -540,20 +879,36 @@ def _parse_persona_profile_xml(text_content: str) -> Tuple[Dict[str, Any], List[
         for entry in list(knowledge_node):
             if not isinstance(entry.tag, str):  # Skip comments/processing instructions
                 continue
-            title = (entry.findtext("title") or entry.attrib.get("title") or "").strip()
-            summary = (entry.findtext("summary") or "").strip()
-            body = (entry.findtext("body") or entry.findtext("content") or "").strip()
-            steps = [
-                step.text.strip()
-                for step in entry.findall(".//step")
-                if step.text and step.text.strip()
-            ]
-            tips = [
-                tip.text.strip()
-                for tip in entry.findall("./tip")
-                if tip.text and tip.text.strip()
-            ]
-            tags_node = entry.find("tags")
+            # Single pass over the entry's children instead of one find/findall per field.
+            fields: Dict[str, str] = {}
+            steps: List[str] = []
+            tips: List[str] = []
+            tags_node = None
+            extra_lines: List[str] = []
+            for child in entry:
+                if not isinstance(child.tag, str):  # Skip comments/processing instructions
+                    continue
+                tag_name = child.tag
+                if tag_name in {"title", "summary", "body", "content"}:
+                    fields.setdefault(tag_name, child.text or "")
+                elif tag_name == "tags":
+                    if tags_node is None:
+                        tags_node = child
+                else:
+                    if tag_name == "tip" and child.text and child.text.strip():
+                        tips.append(child.text.strip())
+                    if tag_name not in {"step", "steps", "tip"}:
+                        child_text = (child.text or "").strip()
+                        if child_text:
+                            heading = child.attrib.get("label") or child.attrib.get("name") or tag_name
+                            extra_lines.append(f"{heading}: {child_text}")
+                steps.extend(
+                    step.text.strip() for step in child.iter("step") if step.text and step.text.strip()
+                )
+
+            title = (fields.get("title") or entry.attrib.get("title") or "").strip()
+            summary = fields.get("summary", "").strip()
+            body = (fields.get("body") or fields.get("content") or "").strip()
             tags: List[str] = []
             if tags_node is not None:
                 tags = [
@@ -577,15 +932,7 @@ def _parse_persona_profile_xml(text_content: str) -> Tuple[Dict[str, Any], List[
             if tips:
                 content_lines.append("Tips:")
                 content_lines.extend([f"- {tip}" for tip in tips])
-
-            for child in entry:
-                tag_name = child.tag if isinstance(child.tag, str) else ""
-                if tag_name in {"title", "summary", "body", "content", "step", "steps", "tip", "tags"}:
-                    continue
-                child_text = (child.text or "").strip()
-                if child_text:
-                    heading = child.attrib.get("label") or child.attrib.get("name") or tag_name
-                    content_lines.append(f"{heading}: {child_text}")
+            content_lines.extend(extra_lines)
 
             content = "\n".join(line.strip() for line in content_lines if line.strip()).strip()
             if not content:
@@ -599,11 +946,60 @@ def _parse_persona_profile_xml(text_content: str) -> Tuple[Dict[str, Any], List[
     return profile_settings, phrases, knowledge_entries
 
 
-def upsert_persona_document(persona_name: str, file_id: str, file_name: str, text_content: str):
+class PersonaWriteBatch:
+    """Collects one persona collection's writes so a sync cycle flushes them together.
+
+    Mirrors the subset of the Collection API the upsert helpers use. Deletes are
+    flushed ahead of everything else so a file's old chunks never outlive its new ones.
+    """
+
+    def __init__(self, collection) -> None:
+        self.collection = collection
+        self.deletes: List[DeleteMany] = []
+        self.writes: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.deletes) + len(self.writes)
+
+    def delete_many(self, filter: Dict[str, Any]) -> None:
+        self.deletes.append(DeleteMany(filter))
+
+    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> None:
+        self.writes.append(UpdateOne(filter, update, upsert=upsert))
+
+    def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True) -> None:
+        self.writes.extend(InsertOne(document) for document in documents)
+
+    def bulk_write(self, operations: List[Any], ordered: bool = True) -> None:
+        self.writes.extend(operations)
+
+    def flush(self) -> None:
+        if not len(self):
+            return
+        # Writes target distinct documents, so grouping them by type is safe and lets
+        # the driver send a handful of commands instead of one per file. Ordered
+        # execution keeps every delete ahead of the writes.
+        writes = sorted(self.writes, key=lambda operation: type(operation).__name__)
+        self.collection.bulk_write(self.deletes + writes, ordered=True)
+        self.deletes, self.writes = [], []
+
+
+def upsert_persona_document(
+    persona_name: str,
+    file_id: str,
+    file_name: str,
+    text_content: str,
+    embeddings_by_text: Optional[Dict[str, List[float]]] = None,
+    write_batch: Optional[PersonaWriteBatch] = None,
+):
     collection_name = f"{PERSONA_COLLECTION_PREFIX}{persona_name}"
     persona_collection = db[collection_name]
+    # Reads always go to the collection; writes are queued when the caller batches them.
+    writer = write_batch if write_batch is not None else persona_collection
     doc_name_clean = os.path.splitext(file_name)[0].lower().strip()
     file_ext = os.path.splitext(file_name)[1].lower()
+    if doc_name_clean in PERSONA_SETTINGS_DOC_NAMES:
+        invalidate_persona_context(persona_name)
 
     if file_ext == ".xml" and doc_name_clean == "profile":
         try:
@@ -612,7 +1008,7 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
             logging.error("Skipping persona %s profile.xml due to parse error: %s", persona_name, exc)
             return
 
-        persona_collection.update_one(
+        writer.update_one(
             {"file_id": file_id, "doc_type": "profile"},
             {
                 "$set": {
@@ -626,7 +1022,7 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
 
         phrases_text = "\n".join(phrases).strip()
         if phrases:
-            persona_collection.update_one(
+            writer.update_one(
                 {"file_id": file_id, "doc_type": "phrases"},
                 {
                     "$set": {
@@ -638,9 +1034,9 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
                 upsert=True,
             )
         else:
-            persona_collection.delete_many({"file_id": file_id, "doc_type": "phrases"})
+            writer.delete_many({"file_id": file_id, "doc_type": "phrases"})
 
-        persona_collection.delete_many(
+        writer.delete_many(
             {"file_id": file_id, "doc_type": "knowledge", "source": "profile_xml"}
         )
 
@@ -656,6 +1052,7 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
             operations = []
             for idx, segment in enumerate(knowledge_segments):
                 embedding = embed_vectors[idx] if idx < len(embed_vectors) else None
+                embedding_set, embedding_unset = _embedding_storage(embedding)
                 operations.append(
                     UpdateOne(
                         {"file_id": file_id, "doc_type": "knowledge", "chunk_index": idx},
@@ -665,22 +1062,23 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
                                 "file_id": file_id,
                                 "chunk_index": idx,
                                 "content": segment["content"],
-                                "embedding": embedding,
+                                **embedding_set,
                                 "metadata": segment.get("metadata", {}),
                                 "source": segment.get("metadata", {}).get("source", "profile_xml"),
-                            }
+                            },
+                            "$unset": embedding_unset,
                         },
                         upsert=True,
                     )
                 )
             if operations:
-                persona_collection.bulk_write(operations)
+                writer.bulk_write(operations, ordered=False)
         return
 
     if doc_name_clean == "profile":
         profile_data = _parse_key_value_doc(text_content)
         if profile_data:
-            persona_collection.update_one(
+            writer.update_one(
                 {"file_id": file_id},
                 {"$set": {"doc_type": "profile", "content": profile_data}},
                 upsert=True,
@@ -688,7 +1086,7 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
         return
 
     if doc_name_clean == "common_phrases":
-        persona_collection.update_one(
+        writer.update_one(
             {"file_id": file_id},
             {"$set": {"doc_type": "phrases", "content": text_content}},
             upsert=True,
@@ -699,26 +1097,76 @@ def upsert_persona_document(persona_name: str, file_id: str, file_name: str, tex
     if not chunks:
         return
     try:
-        embeddings = build_embeddings(chunks)
+        embeddings, chunk_shas = _embed_changed_chunks(persona_collection, file_id, chunks, embeddings_by_text)
     except Exception as exc:  # pragma: no cover - external service call
         logging.error("Embedding generation failed for persona %s: %s", persona_name, exc)
-        embeddings = []
-    operations = [
-        UpdateOne(
-            {"file_id": file_id, "chunk_index": i},
-            {
-                "$set": {
-                    "doc_type": "knowledge",
-                    "content": chunk,
-                    "embedding": embeddings[i] if i < len(embeddings) else None,
-                }
-            },
-            upsert=True,
+        embeddings, chunk_shas = [], [_content_sha(chunk) for chunk in chunks]
+    operations = []
+    for i, chunk in enumerate(chunks):
+        embedding_set, embedding_unset = _embedding_storage(embeddings[i] if i < len(embeddings) else None)
+        operations.append(
+            UpdateOne(
+                {"file_id": file_id, "chunk_index": i},
+                {
+                    "$set": {
+                        "doc_type": "knowledge",
+                        "content": chunk,
+                        "content_sha": chunk_shas[i],
+                        **embedding_set,
+                    },
+                    "$unset": embedding_unset,
+                },
+                upsert=True,
+            )
         )
-        for i, chunk in enumerate(chunks)
-    ]
     if operations:
-        persona_collection.bulk_write(operations)
+        writer.bulk_write(operations, ordered=False)
+
+
+def _content_sha(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _stored_chunk_embeddings(persona_collection, file_id: str) -> Dict[str, List[float]]:
+    cursor = persona_collection.find(
+        {
+            "file_id": file_id,
+            "doc_type": "knowledge",
+            "content_sha": {"$exists": True},
+            "$or": [{"embedding": {"$ne": None}}, {"embedding_q": {"$exists": True}}],
+        },
+        {"_id": 0, "content_sha": 1, "embedding": 1, "embedding_q": 1, "embedding_scale": 1},
+    )
+    return {doc["content_sha"]: resolve_embedding(doc) for doc in cursor}
+
+
+def _embed_changed_chunks(
+    persona_collection,
+    file_id: str,
+    contents: List[str],
+    precomputed: Optional[Dict[str, List[float]]] = None,
+) -> Tuple[List[Optional[List[float]]], List[str]]:
+    """Return (embeddings, content hashes), embedding only chunks whose text changed."""
+    shas = [_content_sha(content) for content in contents]
+    stored = _stored_chunk_embeddings(persona_collection, file_id)
+    pending = [content for content, sha in zip(contents, shas) if sha not in stored]
+    fresh = dict(zip(pending, _embed_texts(pending, precomputed))) if pending else {}
+    return [stored[sha] if sha in stored else fresh.get(content) for content, sha in zip(contents, shas)], shas
+
+
+def _stored_chunks_match(persona_collection, file_id: str, chunks_data: List[Dict[str, Any]]) -> bool:
+    content_hash = (chunks_data[0].get("metadata") or {}).get("content_hash") if chunks_data else None
+    if not content_hash:
+        return False
+    stored = persona_collection.find_one(
+        {"file_id": file_id, "chunk_index": 0},
+        {"_id": 0, "metadata.content_hash": 1},
+    )
+    return bool(
+        stored
+        and (stored.get("metadata") or {}).get("content_hash") == content_hash
+        and persona_collection.count_documents({"file_id": file_id}) == len(chunks_data)
+    )
 
 
 def upsert_persona_document_chunks(
@@ -726,6 +1174,8 @@ def upsert_persona_document_chunks(
     file_id: str,
     file_name: str,
     chunks_data: List[Dict[str, Any]],
+    embeddings_by_text: Optional[Dict[str, List[float]]] = None,
+    write_batch: Optional[PersonaWriteBatch] = None,
 ):
     """Upsert pre-chunked document data (from Docling) into the persona collection.
     
@@ -734,6 +1184,8 @@ def upsert_persona_document_chunks(
         file_id: Google Drive file ID
         file_name: Original filename
         chunks_data: List of dicts with 'content' and 'metadata' keys
+        embeddings_by_text: Vectors already computed for this sync batch, keyed by content
+        write_batch: When given, the writes are queued on it instead of sent immediately
     """
     collection_name = f"{PERSONA_COLLECTION_PREFIX}{persona_name}"
     persona_collection = db[collection_name]
@@ -742,18 +1194,26 @@ def upsert_persona_document_chunks(
         logging.warning("No chunks provided for %s", file_name)
         return
     
+    # Skip re-embedding when the stored chunks came from the same file bytes
+    if _stored_chunks_match(persona_collection, file_id, chunks_data):
+        logging.info("Chunks for %s unchanged; skipping re-embedding", file_name)
+        return
+    
     # Extract content for embedding
     chunk_contents = [chunk["content"] for chunk in chunks_data]
     
-    # Generate embeddings for all chunks
+    # Generate embeddings for new or edited chunks; unchanged ones keep their stored vectors
     try:
-        embeddings = build_embeddings(chunk_contents)
+        embeddings, chunk_shas = _embed_changed_chunks(
+            persona_collection, file_id, chunk_contents, embeddings_by_text
+        )
     except Exception as exc:
         logging.error("Embedding generation failed for persona %s file %s: %s", persona_name, file_name, exc)
-        embeddings = []
+        embeddings, chunk_shas = [], [_content_sha(content) for content in chunk_contents]
     
-    # Build bulk operations
-    operations = []
+    # The file's chunks are rewritten wholesale, so replace them with plain inserts
+    # instead of one upsert lookup per chunk (this also drops chunks past the new tail).
+    documents = []
     for idx, chunk_data in enumerate(chunks_data):
         embedding = embeddings[idx] if idx < len(embeddings) else None
         metadata = chunk_data.get("metadata", {})
@@ -763,37 +1223,36 @@ def upsert_persona_document_chunks(
         metadata["filename"] = file_name
         metadata["source"] = "docling_processed"
         
-        operations.append(
-            UpdateOne(
-                {"file_id": file_id, "chunk_index": idx},
-                {
-                    "$set": {
-                        "doc_type": "knowledge",
-                        "file_id": file_id,
-                        "chunk_index": idx,
-                        "content": chunk_data["content"],
-                        "embedding": embedding,
-                        "metadata": metadata,
-                        "chunk_type": metadata.get("chunk_type", "paragraph"),
-                        "source": "docling_processed",
-                    }
-                },
-                upsert=True,
-            )
+        documents.append(
+            {
+                "doc_type": "knowledge",
+                "file_id": file_id,
+                "chunk_index": idx,
+                "content": chunk_data["content"],
+                "content_sha": chunk_shas[idx],
+                **_embedding_storage(embedding)[0],
+                "metadata": metadata,
+                "chunk_type": metadata.get("chunk_type", "paragraph"),
+                "source": "docling_processed",
+            }
         )
     
-    if operations:
-        result = persona_collection.bulk_write(operations)
+    if documents and write_batch is not None:
+        write_batch.delete_many({"file_id": file_id, "doc_type": "knowledge"})
+        write_batch.insert_many(documents, ordered=False)
+        logging.info("Queued %d Docling chunks for %s", len(documents), file_name)
+    elif documents:
+        deleted = persona_collection.delete_many({"file_id": file_id, "doc_type": "knowledge"})
+        result = persona_collection.insert_many(documents, ordered=False)
         logging.info(
-            "Upserted %d Docling chunks for %s (matched: %d, modified: %d, upserted: %d)",
-            len(operations),
+            "Replaced Docling chunks for %s (removed: %d, inserted: %d)",
             file_name,
-            result.matched_count,
-            result.modified_count,
-            result.upserted_count,
+            deleted.deleted_count,
+            len(result.inserted_ids),
         )
 
 
+@lru_cache(maxsize=256)
 def _persona_slug(name: Optional[str]) -> str:
     return (name or "").lower().replace(" ", "_")
 
@@ -828,128 +1287,586 @@ def _ensure_persona_folder(persona_slug: str) -> Optional[str]:
 # ==============================================================================
 # SYNCER
 # ==============================================================================
+def clear_persona_scan_cache() -> None:
+    with _persona_scan_cache_lock:
+        _persona_scan_cache.clear()
+
+
+def _cached_folder_scan(folder_id: str, modified_time: Optional[str]) -> Optional[Tuple[bool, List[Tuple[str, str, str]]]]:
+    if not modified_time:
+        return None
+    with _persona_scan_cache_lock:
+        entry = _persona_scan_cache.get(folder_id)
+        if entry is None:
+            return None
+        cached_modified, has_profile, child_folders, cached_at = entry
+        if cached_modified != modified_time or time.monotonic() - cached_at > PERSONA_SCAN_CACHE_TTL_SECONDS:
+            _persona_scan_cache.pop(folder_id, None)
+            return None
+        return has_profile, child_folders
+
+
 def find_persona_folders_recursively(folder_id: str) -> List[Dict]:
-    all_persona_folders = []
-    page_token = None
+    """Walk the folder tree breadth-first, listing each level through batched Drive requests.
 
-    while True:
-        try:
-            response = (
-                drive_service.files()
-                .list(
-                    q=f"'{folder_id}' in parents and trashed = false",
-                    fields="nextPageToken, files(id, name, mimeType)",
-                    supportsAllDrives=True,
-                    includeItemsFromAllDrives=True,
-                    pageToken=page_token,
+    Folders whose ``modifiedTime`` matches the last scan reuse its result instead of
+    being listed again.
+    """
+    all_persona_folders: List[Dict] = []
+    persona_ids: Set[str] = set()
+    # Entries are (folder_id, name, modified_time, page_token). Names and modified times
+    # come from the parent's listing, so only the starting folder needs a files().get.
+    frontier: List[Tuple[str, Optional[str], Optional[str], Optional[str]]] = [(folder_id, None, None, None)]
+    # Per-folder results accumulated across listing pages until the last page arrives.
+    scans: Dict[str, Tuple[bool, List[Tuple[str, str, str]]]] = {}
+
+    def add_persona(parent_id: str, parent_name: Optional[str]) -> None:
+        if parent_id not in persona_ids:
+            persona_ids.add(parent_id)
+            all_persona_folders.append({"id": parent_id, "name": parent_name})
+
+    while frontier:
+        next_frontier: List[Tuple[str, Optional[str], Optional[str], Optional[str]]] = []
+        to_list = []
+        for entry in frontier:
+            cached = _cached_folder_scan(entry[0], entry[2]) if entry[3] is None else None
+            if cached is None:
+                to_list.append(entry)
+                continue
+            has_profile, child_folders = cached
+            if has_profile:
+                add_persona(entry[0], entry[1])
+            next_frontier.extend((child_id, name, modified, None) for child_id, name, modified in child_folders)
+
+        for start in range(0, len(to_list), DRIVE_BATCH_MAX_REQUESTS):
+            entries = to_list[start:start + DRIVE_BATCH_MAX_REQUESTS]
+
+            def on_list(request_id, response, exception, entries=entries):
+                parent_id, parent_name, parent_modified, _ = entries[int(request_id)]
+                if exception is not None:
+                    logging.error("Error traversing folder %s: %s", parent_id, exception)
+                    return
+                files = response.get("files", [])
+                has_profile, child_folders = scans.get(parent_id, (False, []))
+                has_profile = has_profile or any(
+                    f["name"].lower() in PERSONA_PROFILE_FILENAMES
+                    for f in files
+                )
+                if has_profile:
+                    add_persona(parent_id, parent_name)
+                for item in files:
+                    if item["mimeType"] == DRIVE_FOLDER_MIME_TYPE:
+                        child_folders.append((item["id"], item["name"], item.get("modifiedTime")))
+                        next_frontier.append((item["id"], item["name"], item.get("modifiedTime"), None))
+                page_token = response.get("nextPageToken")
+                if page_token:
+                    scans[parent_id] = (has_profile, child_folders)
+                    next_frontier.append((parent_id, parent_name, parent_modified, page_token))
+                    return
+                scans.pop(parent_id, None)
+                if parent_modified:
+                    with _persona_scan_cache_lock:
+                        _persona_scan_cache[parent_id] = (
+                            parent_modified, has_profile, child_folders, time.monotonic()
+                        )
+
+            try:
+                service = get_drive_service()
+                batch = service.new_batch_http_request(callback=on_list)
+                for index, (parent_id, _, _, page_token) in enumerate(entries):
+                    batch.add(
+                        service.files().list(
+                            q=f"'{parent_id}' in parents and trashed = false",
+                            fields="nextPageToken, files(id, name, mimeType, modifiedTime)",
+                            pageSize=1000,
+                            supportsAllDrives=True,
+                            includeItemsFromAllDrives=True,
+                            pageToken=page_token,
+                        ),
+                        request_id=str(index),
+                    )
+                batch.execute()
+            except Exception as e:
+                logging.error("Error traversing folders %s: %s", [entry[0] for entry in entries], e)
+        frontier = next_frontier
+
+    for folder in all_persona_folders:
+        if folder["name"] is None:
+            try:
+                folder_info = (
+                    get_drive_service().files()
+                    .get(fileId=folder["id"], fields="name", supportsAllDrives=True)
+                    .execute(num_retries=DRIVE_NUM_RETRIES)
                 )
-                .execute()
+                folder["name"] = folder_info["name"]
+            except Exception as e:
+                logging.error("Error fetching name of folder %s: %s", folder["id"], e)
+    return [folder for folder in all_persona_folders if folder["name"]]
+
+
+def _register_persona(persona_name: str, registered: Set[str]) -> None:
+    if persona_name in registered:
+        return
+    try:
+        db[PERSONA_INDEX_COL].update_one(
+            {"name": persona_name},
+            {"$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        # Sync reads and rewrites chunks by file (stale diff, chunk replacement, per-chunk
+        # upserts); without this every one of those scans the persona collection.
+        db[f"{PERSONA_COLLECTION_PREFIX}{persona_name}"].create_index(
+            [("file_id", ASCENDING), ("chunk_index", ASCENDING)], background=True
+        )
+        registered.add(persona_name)
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.warning("Unable to register persona %s in index: %s", persona_name, exc)
+
+
+def _backfill_persona_index() -> None:
+    """Seed the persona index from existing persona collections (one-off at startup)."""
+    try:
+        collection_names = db.list_collection_names()
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.warning("Unable to enumerate persona collections for index backfill: %s", exc)
+        return
+    registered: Set[str] = set()
+    for name in collection_names:
+        if name.startswith(PERSONA_COLLECTION_PREFIX):
+            _register_persona(name[len(PERSONA_COLLECTION_PREFIX):], registered)
+
+
+def _list_persona_files(folder_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """List the direct children of several folders with one paged query, grouped by folder."""
+    files_by_folder: Dict[str, List[Dict[str, Any]]] = {folder_id: [] for folder_id in folder_ids}
+    parents_clause = " or ".join(f"'{folder_id}' in parents" for folder_id in folder_ids)
+    page_token = None
+    while True:
+        response = (
+            get_drive_service().files()
+            .list(
+                q=f"({parents_clause}) and trashed = false",
+                fields="nextPageToken, files(id, name, mimeType, modifiedTime, size, parents)",
+                pageSize=1000,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+                pageToken=page_token,
             )
+            .execute(num_retries=DRIVE_NUM_RETRIES)
+        )
+        for file in response.get("files", []):
+            for parent in file.get("parents") or []:
+                if parent in files_by_folder:
+                    files_by_folder[parent].append(file)
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return files_by_folder
+
+
+def _drive_sync_executor_for(file: Dict[str, Any]) -> ThreadPoolExecutor:
+    if file.get("mimeType") in DOCLING_MIME_EXTENSIONS:
+        return docling_sync_executor
+    # Google-native files report no size; they are exported as small text.
+    try:
+        size = int(file.get("size") or 0)
+    except (TypeError, ValueError):
+        size = 0
+    return drive_sync_large_executor if size > DRIVE_LARGE_FILE_BYTES else drive_sync_executor
+
+
+def _extract_drive_file(file: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+    """Download and parse one Drive file.
+
+    Returns ``("chunks", chunks)`` for Docling output, ``("text", text)`` for plain
+    extraction, or ``(None, None)`` when nothing usable was produced.
+    """
+    file_id = file["id"]
+    mime_type = file["mimeType"]
+    # Use Docling for PDFs and DOCX for better chunking
+    if mime_type in DOCLING_MIME_EXTENSIONS:
+        try:
+            chunks_data = fetch_and_chunk_with_docling(file_id, mime_type, file["name"])
+            if chunks_data:
+                return "chunks", chunks_data
+            logging.warning("No chunks generated for %s, falling back to text extraction", file["name"])
+        except Exception as exc:
+            logging.error("Docling processing failed for %s: %s, using fallback", file["name"], exc)
+    text = fetch_plain_text(file_id, mime_type)
+    if text:
+        return "text", text
+    return None, None
+
+
+def _embed_sync_batch(persona_collection, extracted: List[Tuple[Dict[str, Any], str, Any]]) -> Dict[str, List[float]]:
+    """Embed every new knowledge chunk of one persona's sync batch in as few requests as possible."""
+    texts: List[str] = []
+    for file, kind, payload in extracted:
+        if kind == "chunks":
+            if _stored_chunks_match(persona_collection, file["id"], payload):
+                continue
+            contents = [chunk["content"] for chunk in payload]
+        elif os.path.splitext(file["name"])[0].lower().strip() not in PERSONA_SETTINGS_DOC_NAMES:
+            contents = _split_text_for_embeddings(payload)
+        else:
+            continue
+        known_shas = set(persona_collection.distinct(
+            "content_sha",
+            {
+                "file_id": file["id"],
+                "doc_type": "knowledge",
+                "$or": [{"embedding": {"$ne": None}}, {"embedding_q": {"$exists": True}}],
+            },
+        ))
+        texts.extend(content for content in contents if _content_sha(content) not in known_shas)
+    unique_texts = list(dict.fromkeys(texts))
+    if not unique_texts:
+        return {}
+    try:
+        return dict(zip(unique_texts, build_embeddings_batched(unique_texts)))
+    except Exception as exc:  # pragma: no cover - external service call
+        logging.error("Batched embedding generation failed; falling back to per-file calls: %s", exc)
+        return {}
+
+
+def _load_drive_page_token() -> Optional[str]:
+    doc = db[DRIVE_SYNC_STATE_COL].find_one({"_id": "drive_changes"}) or {}
+    return doc.get("page_token")
 
-            files = response.get("files", [])
 
-            has_profile = any(
-                f["name"].lower() in {"profile.txt", "profile.xml"}
-                for f in files
+def _save_drive_page_token(page_token: Optional[str]) -> None:
+    if not page_token:
+        return
+    db[DRIVE_SYNC_STATE_COL].update_one(
+        {"_id": "drive_changes"},
+        {"$set": {"page_token": page_token, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+
+
+def _list_drive_changes(page_token: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return every change since ``page_token`` and the token to resume from next cycle."""
+    changes: List[Dict[str, Any]] = []
+    while True:
+        response = (
+            get_drive_service().changes()
+            .list(
+                pageToken=page_token,
+                fields="nextPageToken, newStartPageToken, "
+                "changes(fileId, removed, file(id, name, mimeType, parents, trashed))",
+                pageSize=1000,
+                includeRemoved=True,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
             )
-            if has_profile:
-                folder_info = drive_service.files().get(fileId=folder_id, fields="name").execute()
-                all_persona_folders.append({"id": folder_id, "name": folder_info["name"]})
+            .execute(num_retries=DRIVE_NUM_RETRIES)
+        )
+        changes.extend(response.get("changes", []))
+        if response.get("newStartPageToken"):
+            return changes, response["newStartPageToken"]
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return changes, None
 
-            for item in files:
-                if item["mimeType"] == "application/vnd.google-apps.folder":
-                    all_persona_folders.extend(find_persona_folders_recursively(item["id"]))
 
-            page_token = response.get("nextPageToken", None)
-            if not page_token:
-                break
-        except Exception as e:
-            logging.error(f"Error traversing folder {folder_id}: {e}")
-            break
+def _personas_touched_by(changes: List[Dict[str, Any]], file_personas: Dict[str, str]) -> Optional[Set[str]]:
+    """Map Drive changes to the persona folder ids that need re-listing.
+
+    Returns ``None`` when the folder layout itself may have changed (a folder was
+    added, moved or renamed, or a new profile file appeared), which calls for a full walk.
+    """
+    with PERSONA_FOLDER_LOCK:
+        persona_folder_ids = set(PERSONA_FOLDER_INDEX.values())
+    touched: Set[str] = set()
+    for change in changes:
+        file_id = str(change.get("fileId") or "")
+        file = change.get("file") or {}
+        if file_id in persona_folder_ids or file.get("mimeType") == DRIVE_FOLDER_MIME_TYPE:
+            return None
+        if file_id in file_personas:
+            touched.add(file_personas[file_id])
+        elif change.get("removed"):
+            # Removed files carry no parents; without a record of where they lived,
+            # re-list every persona so stale chunks get dropped.
+            touched.update(persona_folder_ids)
+            continue
+        parents = [parent for parent in file.get("parents") or [] if parent in persona_folder_ids]
+        if parents:
+            touched.update(parents)
+        elif (file.get("name") or "").lower() in PERSONA_PROFILE_FILENAMES:
+            return None
+    return touched
+
+
+def _load_processed_files() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return (file_id -> modifiedTime, file_id -> persona folder id) from the last run."""
+    processed_files: Dict[str, str] = {}
+    file_personas: Dict[str, str] = {}
+    try:
+        for doc in db[DRIVE_PROCESSED_FILES_COL].find({}):
+            processed_files[doc["_id"]] = doc.get("modified_time")
+            if doc.get("persona_folder_id"):
+                file_personas[doc["_id"]] = doc["persona_folder_id"]
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.warning("Unable to load processed Drive files; every file will be re-synced: %s", exc)
+    return processed_files, file_personas
+
+
+def _record_processed_files(
+    files: List[Dict[str, Any]], stale_ids: Set[str], file_personas: Dict[str, str]
+) -> None:
+    operations: List[Any] = [
+        UpdateOne(
+            {"_id": file["id"]},
+            {
+                "$set": {
+                    "modified_time": file["modifiedTime"],
+                    "persona_folder_id": file_personas.get(str(file["id"])),
+                }
+            },
+            upsert=True,
+        )
+        for file in files
+    ]
+    if stale_ids:
+        operations.append(DeleteMany({"_id": {"$in": list(stale_ids)}}))
+    if not operations:
+        return
+    try:
+        db[DRIVE_PROCESSED_FILES_COL].bulk_write(operations, ordered=False)
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.warning("Unable to persist processed Drive files: %s", exc)
 
-    return all_persona_folders
+
+def _prepare_persona_batch(
+    persona_collection, extractions: List[Tuple[Dict[str, Any], Any]]
+) -> Tuple[List[Tuple[Dict[str, Any], str, Any]], Dict[str, List[float]]]:
+    """Wait for one persona's extractions and embed their new chunks."""
+    extracted: List[Tuple[Dict[str, Any], str, Any]] = []
+    for file, future in extractions:
+        try:
+            kind, payload = future.result()
+        except Exception as exc:
+            logging.error("Failed to extract %s: %s", file["name"], exc)
+            continue
+        if kind:
+            extracted.append((file, kind, payload))
+    return extracted, _embed_sync_batch(persona_collection, extracted)
+
+
+def _sync_persona_folders(
+    persona_folders: List[Dict[str, Any]],
+    processed_files: Dict[str, str],
+    registered_personas: Set[str],
+    file_personas: Dict[str, str],
+    persona_file_ids: Dict[str, Set[str]],
+) -> int:
+    """Sync the given persona folders and return how many files were written or removed."""
+    # Persona folders are listed a group at a time with one OR-ed parents query; groups
+    # go out at once and each persona's downloads are queued as soon as its group lands.
+    groups = [
+        persona_folders[start:start + DRIVE_LIST_FOLDERS_PER_QUERY]
+        for start in range(0, len(persona_folders), DRIVE_LIST_FOLDERS_PER_QUERY)
+    ]
+    listings = [
+        (group, drive_sync_executor.submit(_list_persona_files, [folder["id"] for folder in group]))
+        for group in groups
+    ]
+    persona_listings: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+    for group, listing in listings:
+        try:
+            files_by_folder = listing.result()
+        except Exception as exc:
+            logging.error("Failed to list files for personas %s: %s", [folder["name"] for folder in group], exc)
+            continue
+        persona_listings.extend((folder, files_by_folder.get(folder["id"], [])) for folder in group)
+
+    # Slug and collection handle are resolved once per persona per cycle.
+    planned: List[Tuple[str, Any, Set[str], List[Tuple[Dict[str, Any], Any]]]] = []
+    for persona_folder, files in persona_listings:
+        persona_name = _persona_slug(persona_folder["name"])
+        persona_folder_id = persona_folder["id"]
+        _register_persona(persona_name, registered_personas)
+        # Drive ids are already strings.
+        current_file_ids: Set[str] = set()
+        extractions: List[Tuple[Dict[str, Any], Any]] = []
+        for file in files:
+            if file["mimeType"] == DRIVE_FOLDER_MIME_TYPE:
+                continue
+            file_id = file["id"]
+            current_file_ids.add(file_id)
+            file_personas[file_id] = persona_folder_id
+            if processed_files.get(file_id) != file["modifiedTime"]:
+                logging.info("Processing '%s' for persona '%s'...", file["name"], persona_name)
+                extractions.append((file, _drive_sync_executor_for(file).submit(_extract_drive_file, file)))
+        planned.append(
+            (persona_name, db[f"{PERSONA_COLLECTION_PREFIX}{persona_name}"], current_file_ids, extractions)
+        )
+
+    # Embedding requests for different personas overlap; Mongo writes stay on this
+    # thread, in Drive listing order.
+    prepared = [
+        (
+            persona_name,
+            persona_collection,
+            current_file_ids,
+            embedding_executor.submit(_prepare_persona_batch, persona_collection, extractions),
+        )
+        for persona_name, persona_collection, current_file_ids, extractions in planned
+    ]
+    activity = 0
+    for persona_name, persona_collection, current_file_ids, batch in prepared:
+        write_batch = PersonaWriteBatch(persona_collection)
+        extracted, embeddings_by_text = batch.result()
+        for file, kind, payload in extracted:
+            if kind == "chunks":
+                upsert_persona_document_chunks(
+                    persona_name, file["id"], file["name"], payload, embeddings_by_text, write_batch
+                )
+            else:
+                upsert_persona_document(
+                    persona_name, file["id"], file["name"], payload, embeddings_by_text, write_batch
+                )
+        # Only this loop writes Drive-backed documents, so after the first look at a
+        # persona its stored file ids are tracked here instead of re-read every cycle.
+        existing_ids = persona_file_ids.get(persona_name)
+        if existing_ids is None:
+            existing_ids = {str(file_id) for file_id in persona_collection.distinct("file_id") if file_id}
+        stale_ids = existing_ids - current_file_ids
+        if stale_ids:
+            logging.info(
+                "Removing %d stale documents for persona '%s' (files deleted from Drive)",
+                len(stale_ids),
+                persona_name,
+            )
+            write_batch.delete_many({"file_id": {"$in": list(stale_ids)}})
+        if len(write_batch):
+            write_batch.flush()
+            invalidate_persona_context(persona_name)
+        # Only mark files done once their writes have landed, so a failed flush retries them.
+        for file, _, _ in extracted:
+            processed_files[file["id"]] = file["modifiedTime"]
+        _record_processed_files([file for file, _, _ in extracted], stale_ids, file_personas)
+        persona_file_ids[persona_name] = current_file_ids
+        for stale_id in stale_ids:
+            processed_files.pop(stale_id, None)
+            file_personas.pop(stale_id, None)
+        activity += len(extracted) + len(stale_ids)
+    return activity
+
+
+class PollBackoff:
+    """Adaptive poll interval: shrinks while a worker finds work, grows while it is idle."""
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        initial: Optional[float] = None,
+        base: float = 1.3,
+        jitter: float = 0.1,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.base = base
+        self.jitter = jitter
+        self.interval = min(self.max_interval, max(self.min_interval, initial or min_interval))
+
+    def record(self, active: bool) -> float:
+        if active:
+            self.interval = max(self.min_interval, self.interval / self.base)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.base)
+        return self.interval
+
+    def reset(self) -> None:
+        self.interval = self.min_interval
+
+    def sleep(self, wake: Optional[threading.Event] = None) -> None:
+        # Jitter keeps workers started together from polling in lockstep.
+        delay = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if wake is None:
+            time.sleep(delay)
+        else:
+            wake.wait(delay)
 
 
 def sync_drive_personas_task():
-    processed_files = {}
+    # Reloading what earlier runs already synced keeps a restart from re-converting every file.
+    processed_files, file_personas = _load_processed_files()
+    registered_personas: Set[str] = set()
+    persona_file_ids: Dict[str, Set[str]] = {}
+    # A persisted change token means Mongo already reflects Drive as of that token, so
+    # a restart can resume from the change feed instead of walking the whole tree.
+    last_full_sync: Optional[float] = time.monotonic() if _load_drive_page_token() else None
+    backoff = PollBackoff(
+        DRIVE_SYNC_MIN_INTERVAL_SECONDS, DRIVE_SYNC_MAX_INTERVAL_SECONDS, initial=DRIVE_SYNC_INTERVAL_SECONDS
+    )
     while True:
+        activity = 0
         try:
             logging.info("Starting persona sync cycle...")
-            persona_folders = find_persona_folders_recursively(WATCH_FOLDER_ID)
-            logging.info(f"Found {len(persona_folders)} persona folders: {[f['name'] for f in persona_folders]}")
-            _update_persona_folder_cache(persona_folders)
-            for persona_folder in persona_folders:
-                persona_name = persona_folder["name"].lower().replace(" ", "_")
-                current_file_ids: Set[str] = set()
-                files_resp = (
-                    drive_service.files()
-                    .list(
-                        q=f"'{persona_folder['id']}' in parents and trashed = false",
-                        fields="files(id, name, mimeType, modifiedTime)",
-                        supportsAllDrives=True,
-                        includeItemsFromAllDrives=True,
-                    )
-                    .execute()
+            full_sync = last_full_sync is None or (
+                time.monotonic() - last_full_sync >= DRIVE_FULL_SYNC_INTERVAL_SECONDS
+            )
+            page_token = None if full_sync else _load_drive_page_token()
+            if page_token:
+                try:
+                    changes, new_page_token = _list_drive_changes(page_token)
+                except HttpError as exc:
+                    if exc.resp.status != 404:
+                        raise
+                    logging.warning("Drive change token is no longer valid; running a full sync")
+                    full_sync = True
+                else:
+                    touched = _personas_touched_by(changes, file_personas)
+                    if touched is None:
+                        # Folder edits don't always bump the parent's modifiedTime.
+                        clear_persona_scan_cache()
+                        full_sync = True
+                    else:
+                        logging.info(
+                            "Drive reported %d changes touching %d persona folders", len(changes), len(touched)
+                        )
+                        with PERSONA_FOLDER_LOCK:
+                            persona_folders = [
+                                {"id": folder_id, "name": slug}
+                                for slug, folder_id in PERSONA_FOLDER_INDEX.items()
+                                if folder_id in touched
+                            ]
+                        activity = _sync_persona_folders(
+                            persona_folders, processed_files, registered_personas, file_personas, persona_file_ids
+                        )
+                        _save_drive_page_token(new_page_token)
+            else:
+                full_sync = True
+
+            if full_sync:
+                # Take the token before walking so edits made mid-walk are replayed next cycle.
+                start_page_token = (
+                    get_drive_service().changes()
+                    .getStartPageToken(supportsAllDrives=True)
+                    .execute(num_retries=DRIVE_NUM_RETRIES)
+                    .get("startPageToken")
                 )
-                for file in files_resp.get("files", []):
-                    if "folder" in file["mimeType"]:
-                        continue
-                    file_id = file["id"]
-                    modified_time = file["modifiedTime"]
-                    current_file_ids.add(str(file_id))
-                    if file_id not in processed_files or processed_files.get(file_id) != modified_time:
-                        logging.info(f"Processing '{file['name']}' for persona '{persona_name}'...")
-                        
-                        # Use Docling for PDFs and DOCX for better chunking
-                        mime_type = file["mimeType"]
-                        use_docling = mime_type in PDF_MIME_TYPES or mime_type in {
-                            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                            "application/msword",
-                        }
-                        
-                        if use_docling:
-                            # Use Docling-based semantic chunking
-                            try:
-                                chunks_data = fetch_and_chunk_with_docling(file_id, mime_type, file["name"])
-                                if chunks_data:
-                                    upsert_persona_document_chunks(persona_name, file_id, file["name"], chunks_data)
-                                    processed_files[file_id] = modified_time
-                                else:
-                                    logging.warning("No chunks generated for %s, falling back to text extraction", file["name"])
-                                    text = fetch_plain_text(file_id, mime_type)
-                                    if text:
-                                        upsert_persona_document(persona_name, file_id, file["name"], text)
-                                        processed_files[file_id] = modified_time
-                            except Exception as exc:
-                                logging.error("Docling processing failed for %s: %s, using fallback", file["name"], exc)
-                                text = fetch_plain_text(file_id, mime_type)
-                                if text:
-                                    upsert_persona_document(persona_name, file_id, file["name"], text)
-                                    processed_files[file_id] = modified_time
-                        else:
-                            # Use standard text extraction for other file types
-                            text = fetch_plain_text(file_id, mime_type)
-                            if text:
-                                upsert_persona_document(persona_name, file_id, file["name"], text)
-                                processed_files[file_id] = modified_time
-                persona_collection = db[f"{PERSONA_COLLECTION_PREFIX}{persona_name}"]
-                existing_cursor = persona_collection.find({"file_id": {"$exists": True}}, {"file_id": 1})
-                existing_ids = {str(doc.get("file_id")) for doc in existing_cursor if doc.get("file_id")}
-                stale_ids = existing_ids - current_file_ids
-                if stale_ids:
+                persona_folders = find_persona_folders_recursively(WATCH_FOLDER_ID)
+                if logging.getLogger().isEnabledFor(logging.INFO):
                     logging.info(
-                        "Removing %d stale documents for persona '%s' (files deleted from Drive)",
-                        len(stale_ids),
-                        persona_name,
+                        "Found %d persona folders: %s",
+                        len(persona_folders),
+                        [folder["name"] for folder in persona_folders],
                     )
-                    persona_collection.delete_many({"file_id": {"$in": list(stale_ids)}})
-                    for stale_id in stale_ids:
-                        processed_files.pop(stale_id, None)
+                _update_persona_folder_cache(persona_folders)
+                activity = _sync_persona_folders(
+                    persona_folders, processed_files, registered_personas, file_personas, persona_file_ids
+                )
+                _save_drive_page_token(start_page_token)
+                last_full_sync = time.monotonic()
         except Exception as e:
-            logging.error(f"Error during sync loop: {e}")
+            logging.error("Error during sync loop: %s", e)
 
-        logging.info("Sync cycle finished. Waiting for 60 seconds.")
-        time.sleep(60)
+        backoff.record(activity > 0)
+        logging.info("Sync cycle finished (%d files changed). Waiting about %.0f seconds.", activity, backoff.interval)
+        backoff.sleep()
 
 
 def glpi_sync_worker():
@@ -959,13 +1876,21 @@ def glpi_sync_worker():
 
 
 def knowledge_pipeline_worker():
+    backoff = PollBackoff(KNOWLEDGE_PIPELINE_MIN_INTERVAL_SECONDS, KNOWLEDGE_PIPELINE_INTERVAL_SECONDS)
     while True:
+        # Cleared before polling so anything enqueued while we work wakes the next wait.
+        knowledge_pipeline.work_event.clear()
         try:
             processed = knowledge_pipeline.process_next()
         except Exception as exc:  # pragma: no cover - defensive
             logging.error("Knowledge pipeline error: %s", exc)
             processed = False
-        time.sleep(5 if processed else KNOWLEDGE_PIPELINE_INTERVAL_SECONDS)
+        # A processed item usually means more are queued, so drop straight to the floor.
+        if processed:
+            backoff.reset()
+        else:
+            backoff.record(False)
+        backoff.sleep(knowledge_pipeline.work_event)
 
 
 def analytics_worker():
@@ -979,11 +1904,16 @@ def analytics_worker():
 
 def metrics_worker():
     while True:
+        feedback_loop.work_event.clear()
         try:
             feedback_loop.compute_metrics()
         except Exception as exc:  # pragma: no cover - defensive
             logging.error("Metrics aggregation failed: %s", exc)
-        time.sleep(METRICS_REFRESH_INTERVAL_SECONDS)
+        # Sit out the floor before listening for feedback again, so a burst of /feedback
+        # posts collapses into one recompute instead of one full aggregation per post.
+        min_interval = min(METRICS_MIN_INTERVAL_SECONDS, METRICS_REFRESH_INTERVAL_SECONDS)
+        time.sleep(min_interval)
+        feedback_loop.work_event.wait(METRICS_REFRESH_INTERVAL_SECONDS - min_interval)
 
 
 def _spawn_daemon(name: str, target):
@@ -992,6 +1922,51 @@ def _spawn_daemon(name: str, target):
     return thread
 
 
+def ensure_indexes():
+    index_specs = [
+        (KNOWLEDGE_QUEUE_COL, [("status", ASCENDING), ("updated_at", DESCENDING)], {}),
+        # The unfiltered /knowledge/queue listing sorts on updated_at alone.
+        (KNOWLEDGE_QUEUE_COL, [("updated_at", DESCENDING)], {}),
+        (USER_PROFILES_COL, [("user_id", ASCENDING)], {"unique": True}),
+        (CHAT_HISTORY_COL, [("user_id", ASCENDING), ("timestamp", DESCENDING)], {}),
+        (PERSONA_INDEX_COL, [("name", ASCENDING)], {"unique": True}),
+        # ticket_id leads so ticket-only lookups can use the index as well.
+        (
+            SUPPORT_ESCALATIONS_COL,
+            [("ticket_id", ASCENDING), ("user_id", ASCENDING), ("persona", ASCENDING)],
+            {},
+        ),
+    ]
+    for collection_name, keys, options in index_specs:
+        try:
+            db[collection_name].create_index(keys, background=True, **options)
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.warning("Unable to ensure index %s on %s: %s", keys, collection_name, exc)
+    _backfill_persona_index()
+
+
+_indexes_lock = threading.Lock()
+_indexes_started = False
+
+
+def _ensure_indexes_started() -> None:
+    # Started lazily because WSGI servers import the app without running __main__.
+    # create_index is idempotent, so every worker process may run it; it runs in the
+    # background so a slow or unreachable Mongo does not stall the first request.
+    global _indexes_started
+    if _indexes_started:
+        return
+    with _indexes_lock:
+        if not _indexes_started:
+            _indexes_started = True
+            _spawn_daemon("ensure_indexes", ensure_indexes)
+
+
+@app.before_request
+def _prepare_storage() -> None:
+    _ensure_indexes_started()
+
+
 def start_background_threads():
     try:
         initial_persona_folders = find_persona_folders_recursively(WATCH_FOLDER_ID)
@@ -999,6 +1974,7 @@ def start_background_threads():
             _update_persona_folder_cache(initial_persona_folders)
     except Exception as exc:
         logging.warning("Unable to prime persona folder cache: %s", exc)
+    _spawn_daemon("docling_warmup", docling_converter.warm_up)
     _spawn_daemon("drive_sync", sync_drive_personas_task)
     if glpi_sync_service:
         _spawn_daemon("glpi_sync", glpi_sync_worker)
@@ -1009,36 +1985,123 @@ def start_background_threads():
 # ==============================================================================
 # HISTORY
 # ==============================================================================
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# user_id -> (most recent messages, whether that is the user's entire history)
+_history_cache: "OrderedDict[str, Tuple[deque, bool]]" = OrderedDict()
+_history_cache_lock = threading.Lock()
+
+
+def _cache_history_message(user_id: str, role: str, content: str) -> None:
+    with _history_cache_lock:
+        entry = _history_cache.get(user_id)
+        if entry is not None:
+            entry[0].append({"role": role, "content": content})
+            _history_cache.move_to_end(user_id)
+
+
 def save_message_to_history(user_id: str, role: str, content: str):
-    # Store content as-is; _format_transcript() will add role prefixes when needed
-    db[CHAT_HISTORY_COL].insert_one(
-        {"user_id": user_id, "role": role, "content": content, "timestamp": datetime.now()}
-    )
+    # Store content as-is; _format_transcript() will add role prefixes when needed.
+    # timestamp must stay a BSON date: BSON orders numbers before dates, so mixing in
+    # integer epochs would sort new messages behind existing history.
+    doc = {"user_id": user_id, "role": role, "content": content, "timestamp": datetime.now()}
+    if CHAT_HISTORY_CACHE_ENABLED:
+        _cache_history_message(user_id, role, content)
+    db[CHAT_HISTORY_COL].insert_one(doc)
 
 
 def get_relevant_history(user_id: str, k: int) -> list:
-    history_cursor = db[CHAT_HISTORY_COL].find({"user_id": user_id}).sort("timestamp", DESCENDING).limit(k)
-    return [{"role": msg["role"], "content": msg["content"]} for msg in reversed(list(history_cursor))]
+    if CHAT_HISTORY_CACHE_ENABLED:
+        with _history_cache_lock:
+            entry = _history_cache.get(user_id)
+            # A "complete" entry stops being complete once the deque starts dropping messages.
+            if entry is not None and (
+                len(entry[0]) >= k or (entry[1] and len(entry[0]) < CHAT_HISTORY_CACHE_DEPTH)
+            ):
+                _history_cache.move_to_end(user_id)
+                return [dict(message) for message in list(entry[0])[-k:]] if k > 0 else []
+    # Served newest-first by the (user_id, timestamp) index; only the fields the prompt uses come back.
+    history_cursor = (
+        db[CHAT_HISTORY_COL]
+        .find({"user_id": user_id}, {"_id": 0, "role": 1, "content": 1})
+        .sort("timestamp", DESCENDING)
+        .limit(k)
+    )
+    history = list(history_cursor)
+    history.reverse()
+    if CHAT_HISTORY_CACHE_ENABLED:
+        with _history_cache_lock:
+            _history_cache[user_id] = (
+                deque((dict(message) for message in history), maxlen=CHAT_HISTORY_CACHE_DEPTH),
+                len(history) < k,
+            )
+            _history_cache.move_to_end(user_id)
+            while len(_history_cache) > CHAT_HISTORY_CACHE_MAX_USERS:
+                _history_cache.popitem(last=False)
+    return history
 
 # ==============================================================================
 # PERSONA / RAG
 # ==============================================================================
 
 
-def get_persona_context(persona_name: str) -> tuple:
+_persona_context_cache: Dict[str, Tuple[float, Dict[str, Any], str]] = {}
+_persona_context_lock = threading.Lock()
+
+
+def invalidate_persona_context(persona_name: Optional[str] = None) -> None:
+    """Drop cached persona settings (all personas when no name is given)."""
+    with _persona_context_lock:
+        if persona_name is None:
+            _persona_context_cache.clear()
+        else:
+            _persona_context_cache.pop(persona_name, None)
+
+
+def _load_persona_context(persona_name: str) -> Tuple[Dict[str, Any], str]:
     collection_name = f"{PERSONA_COLLECTION_PREFIX}{persona_name}"
     persona_collection = db[collection_name]
-    profile_doc = persona_collection.find_one({"doc_type": "profile"})
-    model_settings = profile_doc["content"] if profile_doc else {}
-    phrases_doc = persona_collection.find_one({"doc_type": "phrases"})
-    common_phrases = phrases_doc["content"] if phrases_doc else ""
-    logging.info(f"Loaded persona %s with settings keys: %s", persona_name, list(model_settings.keys()))
+    model_settings: Dict[str, Any] = {}
+    common_phrases = ""
+    seen: Set[str] = set()
+    for doc in persona_collection.find(
+        {"doc_type": {"$in": ["profile", "phrases"]}}, {"doc_type": 1, "content": 1}
+    ):
+        # Keep the first match per type, as find_one did.
+        if doc["doc_type"] in seen:
+            continue
+        seen.add(doc["doc_type"])
+        if doc["doc_type"] == "profile":
+            model_settings = doc.get("content") or {}
+        else:
+            common_phrases = doc.get("content") or ""
+    logging.info("Loaded persona %s with settings keys: %s", persona_name, list(model_settings.keys()))
     return model_settings, common_phrases
 
+
+def get_persona_context(persona_name: str) -> tuple:
+    now = time.monotonic()
+    with _persona_context_lock:
+        cached = _persona_context_cache.get(persona_name)
+    if cached and now - cached[0] < PERSONA_CONTEXT_TTL_SECONDS:
+        return dict(cached[1]), cached[2]
+    model_settings, common_phrases = _load_persona_context(persona_name)
+    with _persona_context_lock:
+        _persona_context_cache.pop(persona_name, None)
+        while len(_persona_context_cache) >= PERSONA_CONTEXT_CACHE_MAX_ENTRIES:
+            _persona_context_cache.pop(next(iter(_persona_context_cache)))
+        _persona_context_cache[persona_name] = (now, model_settings, common_phrases)
+    return dict(model_settings), common_phrases
+
 # ==============================================================================
 # LLM HELPERS
 # ==============================================================================
 def _llm_json_call(system_prompt: str, user_content: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
+    # JSON mode guarantees a bare object, so the fence stripping below is only needed
+    # for callers that expect a top-level array (which JSON mode cannot return).
+    json_mode = isinstance(fallback, dict)
     try:
         resp = openai_client.chat.completions.create(
             model=CHAT_MODEL,
@@ -1048,14 +2111,16 @@ def _llm_json_call(system_prompt: str, user_content: str, fallback: Dict[str, An
                 {"role": "user", "content": user_content},
             ],
             max_tokens=300,
+            **({"response_format": {"type": "json_object"}} if json_mode else {}),
         )
-        txt = resp.choices[0].message.content.strip()
-        txt = txt.strip("`").strip()
-        if txt.lower().startswith("json"):
-            txt = txt[4:].strip()
-        return json.loads(txt)
+        txt = resp.choices[0].message.content
+        if not json_mode:
+            txt = txt.strip().strip("`").strip()
+            if txt.lower().startswith("json"):
+                txt = txt[4:].strip()
+        return orjson.loads(txt)
     except Exception as e:
-        logging.warning(f"LLM JSON parse fallback: {e}")
+        logging.warning("LLM JSON parse fallback: %s", e)
         return fallback
 
 
@@ -1139,22 +2204,38 @@ def infer_conversation_tone(history: List[Dict[str, str]]) -> Dict[str, Any]:
 # ==============================================================================
 CRM_ALLOWED_FIELDS = crm_enrichment_config.field_names
 
+# Profile fields consumed by the chat flow (agent prompt, memory snippet, profile tool);
+# bulky bookkeeping such as last_router_decision stays on the server.
+USER_PROFILE_PROJECTION: Dict[str, int] = {
+    "_id": 0,
+    "user_id": 1,
+    "message_count": 1,
+    "tone_preference": 1,
+    "tone_observed": 1,
+    "active_tickets": 1,
+    "assist_attempts_with_kb": 1,
+}
+for _crm_field in list(CRM_ALLOWED_FIELDS) + list(crm_enrichment_config.memory_priority):
+    USER_PROFILE_PROJECTION.setdefault(_crm_field, 1)
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_CRM_EXTRACTION_SYSTEM_PROMPT = (
+    "Extract structured CRM fields from the message and short history if available.\n"
+    f"Only these keys: {CRM_ALLOWED_FIELDS}.\n"
+    "Return a STRICT JSON object with any found keys. "
+    "If a field is not present, omit it."
+)
+
 def extract_and_upsert_profile_fields(user_id: str, message: str, history: Optional[List[Dict[str, str]]] = None):
     if not CRM_ALLOWED_FIELDS:
         return
     context = ""
     if history:
         context = "\nRecent history:\n" + "\n".join([f"{m['role']}: {m['content']}" for m in history[-6:]])
-    system = (
-        "Extract structured CRM fields from the message and short history if available.\n"
-        f"Only these keys: {CRM_ALLOWED_FIELDS}.\n"
-        "Return a STRICT JSON object with any found keys. "
-        "If a field is not present, omit it."
-    )
-    result = _llm_json_call(system, f"Message:\n{message}\n{context}", {})
+    result = _llm_json_call(_CRM_EXTRACTION_SYSTEM_PROMPT, f"Message:\n{message}\n{context}", {})
     normalized_result = crm_enrichment_config.normalize(result)
     if "email" in CRM_ALLOWED_FIELDS and "email" not in normalized_result:
-        m = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", message or "")
+        m = _EMAIL_RE.search(message or "")
         if m:
             normalized_result["email"] = m.group(0).lower()
     if not normalized_result:
@@ -1198,19 +2279,20 @@ def build_user_memory_snippet(user_profile: Dict[str, Any]) -> str:
 # ==============================================================================
 # MESSAGE CONSTRUCTION
 # ==============================================================================
+# (classification key, label) in the order they appear in the router context line.
+_ROUTER_CONTEXT_FIELDS = (
+    ("issue_category", "category"),
+    ("issue_type", "type"),
+    ("urgency", "urgency"),
+    ("impact_scope", "impact"),
+)
+
+
 def build_router_context(router_payload: Optional[Dict[str, Any]]) -> str:
     if not router_payload:
         return "Router assessment unavailable for this turn."
     classification = router_payload.get("classification", {})
-    parts = []
-    if classification.get("issue_category"):
-        parts.append(f"category={classification['issue_category']}")
-    if classification.get("issue_type"):
-        parts.append(f"type={classification['issue_type']}")
-    if classification.get("urgency"):
-        parts.append(f"urgency={classification['urgency']}")
-    if classification.get("impact_scope"):
-        parts.append(f"impact={classification['impact_scope']}")
+    parts = [f"{label}={classification[key]}" for key, label in _ROUTER_CONTEXT_FIELDS if classification.get(key)]
     if classification.get("confidence") is not None:
         parts.append(f"confidence={classification['confidence']}")
     header = "Router classification: " + ", ".join(parts) if parts else "Router classification unavailable."
@@ -1220,6 +2302,39 @@ def build_router_context(router_payload: Optional[Dict[str, Any]]) -> str:
     return f"{header}\nSuggested references:\n{snippet_block}"
 
 
+@lru_cache(maxsize=256)
+def _support_static_prompt(
+    agent_name: str,
+    persona_identity: str,
+    instruction: str,
+    approved_phrases: str,
+    tone_guidelines: str,
+) -> str:
+    prompt = f"""
+You are "{agent_name}", {persona_identity} for this persona.
+Objective: {instruction}
+
+Constraints:
+- Use only approved knowledge below plus router guidance.
+- Never invent fixes; if unsure, say you will escalate or gather more detail.
+- When giving steps, number them and keep each step under 25 words.
+- Speak naturally like a support agent; do not mention internal document IDs or "limited confidence" disclaimers.
+- Use these approved phrases when natural: {approved_phrases}
+"""
+    if tone_guidelines:
+        prompt += f"- Style specifics: {tone_guidelines}\n"
+
+    prompt += """
+Self-RAG protocol:
+1. BEFORE answering output [RELEVANT] if the knowledge is sufficient, otherwise output [IRRELEVANT].
+2. If [IRRELEVANT], respond with a brief apology and offer to escalate or follow up with a human.
+3. If [RELEVANT], answer the query using ONLY the provided knowledge in natural language (no citation brackets).
+4. AFTER your answer, output [GROUNDED] if every claim is supported by the provided knowledge or [UNGROUNDED] otherwise.
+5. Prefer [IRRELEVANT] or [UNGROUNDED] over guessing.
+"""
+    return prompt
+
+
 def construct_support_messages(
     model_settings,
     history,
@@ -1237,6 +2352,10 @@ def construct_support_messages(
     instruction = model_settings.get("support_instruction") or default_instruction
     tone_guidelines = model_settings.get("tone_guidelines") or model_settings.get("style_notes")
     approved_phrases = common_phrases or model_settings.get("approved_phrases") or "n/a"
+    if isinstance(approved_phrases, (list, tuple)):
+        # profile.xml can list phrases individually; join them so the prompt reads
+        # naturally and the cached static prompt is keyed on the phrase text.
+        approved_phrases = "; ".join(str(phrase) for phrase in approved_phrases)
     memory = build_user_memory_snippet(user_profile)
     tone_pref = user_profile.get("tone_preference", "")
     tone_obs = (user_profile.get("tone_observed") or "neutral")
@@ -1248,34 +2367,19 @@ def construct_support_messages(
         or "a senior support specialist"
     )
     router_context = build_router_context(router_payload)
-    system_prompt = f"""
-You are "{agent_name}", {persona_identity} for this persona.
-Objective: {instruction}
-
-Constraints:
-- Use only approved knowledge below plus router guidance.
-- Never invent fixes; if unsure, say you will escalate or gather more detail.
-- Tone: match preference ({tone_pref or 'none'}) else observed tone ({tone_obs}).
-- When giving steps, number them and keep each step under 25 words.
-- Speak naturally like a support agent; do not mention internal document IDs or "limited confidence" disclaimers.
-- Use these approved phrases when natural: {approved_phrases}
-"""
-    if tone_guidelines:
-        system_prompt += f"\n- Style specifics: {tone_guidelines}"
-
-    system_prompt += f"""
+    # Static persona text leads so consecutive turns share a cacheable prompt prefix;
+    # everything that changes per turn follows it.
+    # Settings can come from profile.xml as lists or dicts; str() keeps the cache key hashable
+    # and renders exactly as the f-string interpolation did.
+    system_prompt = _support_static_prompt(
+        str(agent_name), str(persona_identity), str(instruction), str(approved_phrases), str(tone_guidelines or "")
+    ) + f"""
+Tone: match preference ({tone_pref or 'none'}) else observed tone ({tone_obs}).
 
 User memory: {memory}
 Router context:\n{router_context}
 
 Knowledge base snippets:\n{knowledge_block}
-
-Self-RAG protocol:
-1. BEFORE answering output [RELEVANT] if the knowledge is sufficient, otherwise output [IRRELEVANT].
-2. If [IRRELEVANT], respond with a brief apology and offer to escalate or follow up with a human.
-3. If [RELEVANT], answer the query using ONLY the provided knowledge in natural language (no citation brackets).
-4. AFTER your answer, output [GROUNDED] if every claim is supported by the provided knowledge or [UNGROUNDED] otherwise.
-5. Prefer [IRRELEVANT] or [UNGROUNDED] over guessing.
 """
     messages = [{"role": "system", "content": system_prompt}]
     messages.extend(history)
@@ -1283,24 +2387,48 @@ Self-RAG protocol:
 
 
 def _sanitize_chunks_for_agent(chunks: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-    safe_chunks: List[Dict[str, Any]] = []
     if not chunks:
-        return safe_chunks
-    for chunk in chunks:
-        preview = (chunk.get("preview") or chunk.get("content") or "").strip()
-        safe_chunks.append(
-            {
-                "citation_id": chunk.get("citation_id"),
-                "doc_id": chunk.get("doc_id"),
-                "preview": preview[:800],
-                "source": chunk.get("source"),
-                "similarity": chunk.get("similarity_score"),
-                "lexical_score": chunk.get("lexical_score"),
-                "fusion_score": chunk.get("fusion_score"),
-                "metadata": chunk.get("metadata", {}),
-            }
-        )
-    return safe_chunks
+        return []
+    return [
+        {
+            "citation_id": chunk.get("citation_id"),
+            "doc_id": chunk.get("doc_id"),
+            "preview": (chunk.get("preview") or chunk.get("content") or "").strip()[:800],
+            "source": chunk.get("source"),
+            "similarity": chunk.get("similarity_score"),
+            "lexical_score": chunk.get("lexical_score"),
+            "fusion_score": chunk.get("fusion_score"),
+            "metadata": chunk.get("metadata") or {},
+        }
+        for chunk in chunks
+    ]
+
+
+@lru_cache(maxsize=256)
+def _agent_static_prompt(agent_name: str, persona_identity: str, instruction: str, tone_guidelines: str) -> str:
+    prompt = f"""
+You are "{agent_name}", {persona_identity} for this persona. Your task: {instruction}
+
+You operate as an agentic assistant with access to tools. Think through problems step-by-step internally (do not reveal chain-of-thought) and decide which tool to call next. Always confirm facts with tools before answering.
+
+Constraints:
+- Number troubleshooting steps and keep them concise (<25 words).
+- Be transparent about uncertainties and offer next actions.
+"""
+    if tone_guidelines:
+        prompt += f"- Style guidance: {tone_guidelines}\n"
+
+    prompt += "\nAvailable tools and guidance:\n"
+    prompt += "1. get_router_signals(issue_summary) → classification, urgency, and routing advice.\n"
+    prompt += "2. search_persona_knowledge(query) → retrieve validated knowledge snippets.\n"
+    prompt += "3. retrieve_user_profile(fields?) → review stored CRM context.\n"
+    prompt += "4. summarize_recent_history(limit?) → quick recap of the conversation.\n"
+    prompt += "5. create_support_ticket(summary, reason) → escalate to a human; must call before telling the user you're escalating.\n"
+    prompt += (
+        "You may call tools multiple times. After gathering enough evidence, craft a natural, empathetic reply. "
+        "Cite knowledge snippets descriptively (e.g., “One guide recommends…”) rather than raw IDs."
+    )
+    return prompt.strip()
 
 
 def _build_agent_system_prompt(
@@ -1323,34 +2451,93 @@ def _build_agent_system_prompt(
         or model_settings.get("persona_identity")
         or model_settings.get("role_description")
         or "a senior support specialist"
-    )
-
-    prompt = f"""
-You are "{agent_name}", {persona_identity} for this persona. Your task: {instruction}
-
-You operate as an agentic assistant with access to tools. Think through problems step-by-step internally (do not reveal chain-of-thought) and decide which tool to call next. Always confirm facts with tools before answering.
-
-Constraints:
-- Match the customer's preferred tone ({tone_pref or 'none'}) or observed tone ({tone_obs}).
-- Number troubleshooting steps and keep them concise (<25 words).
-- Be transparent about uncertainties and offer next actions.
-- If knowledge remains insufficient after {min_turns} assistive attempts (currently at {assist_attempts}), call the ticket tool to escalate. Do not promise escalation without using the tool.
-"""
-    if tone_guidelines:
-        prompt += f"\n- Style guidance: {tone_guidelines}"
+    )
 
-    prompt += "\n\nAvailable tools and guidance:\n"
-    prompt += "1. get_router_signals(issue_summary) → classification, urgency, and routing advice.\n"
-    prompt += "2. search_persona_knowledge(query) → retrieve validated knowledge snippets.\n"
-    prompt += "3. retrieve_user_profile(fields?) → review stored CRM context.\n"
-    prompt += "4. summarize_recent_history(limit?) → quick recap of the conversation.\n"
-    prompt += "5. create_support_ticket(summary, reason) → escalate to a human; must call before telling the user you're escalating.\n"
-    prompt += (
-        "You may call tools multiple times. After gathering enough evidence, craft a natural, empathetic reply. "
-        "Cite knowledge snippets descriptively (e.g., “One guide recommends…”) rather than raw IDs."
+    # The per-turn constraints go last so the static prefix is identical across turns.
+    prompt = _agent_static_prompt(
+        str(agent_name), str(persona_identity), str(instruction), str(tone_guidelines or "")
     )
+    prompt += f"""
 
-    return prompt.strip()
+Current conversation:
+- Match the customer's preferred tone ({tone_pref or 'none'}) or observed tone ({tone_obs}).
+- If knowledge remains insufficient after {min_turns} assistive attempts (currently at {assist_attempts}), call the ticket tool to escalate. Do not promise escalation without using the tool."""
+    return prompt
+
+
+# (name, description, JSON schema) for each support agent tool; only the handlers
+# are bound per request.
+_SUPPORT_AGENT_TOOL_SPECS: Tuple[Tuple[str, str, Dict[str, Any]], ...] = (
+    (
+        "get_router_signals",
+        "Classify the issue, get urgency, sentiment, and routing recommendation.",
+        {
+            "type": "object",
+            "properties": {
+                "issue_summary": {"type": "string", "description": "Short description of the issue."},
+                "ticket_id": {"type": "string", "description": "Optional ticket identifier override."},
+            },
+        },
+    ),
+    (
+        "search_persona_knowledge",
+        "Retrieve high-confidence knowledge snippets for this persona.",
+        {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Question or topic to search for."},
+            },
+            "required": ["query"],
+        },
+    ),
+    (
+        "create_support_ticket",
+        "Escalate to a human agent by creating a GLPI ticket.",
+        {
+            "type": "object",
+            "properties": {
+                "summary": {"type": "string", "description": "Summary included in the ticket."},
+                "reason": {"type": "string", "description": "Why the escalation is required."},
+            },
+            "required": ["reason"],
+        },
+    ),
+    (
+        "retrieve_user_profile",
+        "Inspect stored CRM attributes for the current user.",
+        {
+            "type": "object",
+            "properties": {
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional subset of fields to retrieve.",
+                }
+            },
+        },
+    ),
+    (
+        "summarize_recent_history",
+        "Review the recent conversation transcript for context.",
+        {
+            "type": "object",
+            "properties": {
+                "limit": {
+                    "type": "integer",
+                    "description": "Number of recent lines to return (default 8).",
+                    "minimum": 1,
+                    "maximum": 40,
+                }
+            },
+        },
+    ),
+)
+
+# Function-calling schemas for the tools above, shared by every agent session.
+_SUPPORT_AGENT_FUNCTIONS: List[Dict[str, Any]] = [
+    {"name": name, "description": description, "parameters": parameters}
+    for name, description, parameters in _SUPPORT_AGENT_TOOL_SPECS
+]
 
 
 def _build_support_agent_tools(
@@ -1367,8 +2554,21 @@ def _build_support_agent_tools(
         "router_calls": [],
         "rag_calls": [],
         "ticket": None,
+        "query_embeddings": {},
+        "transcript": None,
+        "last_router_hash": None,
+        "memory_snippet": None,
     }
 
+    def _query_embedding(text: str) -> Optional[List[float]]:
+        # The router and knowledge tools usually run on the same text within a turn,
+        # so share one embeddings request between them.
+        cache = tool_state["query_embeddings"]
+        if text not in cache:
+            vectors = build_embeddings([text])
+            cache[text] = vectors[0] if vectors else None
+        return cache[text]
+
     def _router_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
         if not ticket_router:
             return {"status": "unavailable", "reason": "ticket_router_disabled"}
@@ -1381,21 +2581,33 @@ def _build_support_agent_tools(
             summary,
             ticket_id=ticket_id,
             metadata={"persona": persona_name},
+            precomputed_embedding=_query_embedding(summary),
         )
         tool_state["router"] = payload
         tool_state["router_calls"].append(payload)
-        db[USER_PROFILES_COL].update_one(
-            {"user_id": user_id},
-            {"$set": {"last_router_decision": payload}},
-            upsert=True,
-        )
+        # Repeat router calls in one turn often produce the same decision; skip the
+        # profile write when nothing changed.
+        payload_hash = hashlib.blake2b(
+            orjson.dumps(payload, default=str, option=orjson.OPT_SORT_KEYS), digest_size=8
+        ).digest()
+        if payload_hash != tool_state["last_router_hash"]:
+            db[USER_PROFILES_COL].update_one(
+                {"user_id": user_id},
+                {"$set": {"last_router_decision": payload}},
+                upsert=True,
+            )
+            tool_state["last_router_hash"] = payload_hash
         return {"status": "ok", "payload": payload}
 
     def _knowledge_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
         query = (arguments.get("query") or latest_user_message or "").strip()
         if not query:
             return {"status": "error", "error": "query_required"}
-        context = rag_pipeline.build_context(persona_name, query)
+        context = rag_pipeline.build_context(
+            persona_name,
+            query,
+            precomputed_embedding=_query_embedding(query),
+        )
         tool_state["rag_calls"].append(context)
         return {
             "status": "ok",
@@ -1431,6 +2643,13 @@ def _build_support_agent_tools(
         }
         return {"status": "ok", "ticket_id": ticket_id_str, "reason": reason}
 
+    def _memory_snippet() -> str:
+        # The profile tool can be called several times in one turn; the profile
+        # itself does not change in between.
+        if tool_state["memory_snippet"] is None:
+            tool_state["memory_snippet"] = build_user_memory_snippet(user_profile)
+        return tool_state["memory_snippet"]
+
     def _profile_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
         fields = arguments.get("fields") or []
         if fields and isinstance(fields, list):
@@ -1444,106 +2663,50 @@ def _build_support_agent_tools(
         return {
             "status": "ok",
             "profile": serializable_subset,
-            "memory": build_user_memory_snippet(user_profile),
+            "memory": _memory_snippet(),
         }
 
     def _history_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
         limit = int(arguments.get("limit", 8))
-        transcript = _format_transcript(history, latest_user_message)
-        lines = transcript.splitlines()[-limit:]
+        # The agent may ask for history several times in one turn; format it once
+        # per history length.
+        cached = tool_state["transcript"]
+        if cached is None or cached[0] != len(history):
+            cached = (len(history), _format_transcript(history, latest_user_message).splitlines())
+            tool_state["transcript"] = cached
+        lines = cached[1][-limit:]
         return {"status": "ok", "transcript": "\n".join(lines)}
 
+    handlers = {
+        "get_router_signals": _router_tool,
+        "search_persona_knowledge": _knowledge_tool,
+        "create_support_ticket": _ticket_tool,
+        "retrieve_user_profile": _profile_tool,
+        "summarize_recent_history": _history_tool,
+    }
     tools = [
-        AgentTool(
-            name="get_router_signals",
-            description="Classify the issue, get urgency, sentiment, and routing recommendation.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "issue_summary": {"type": "string", "description": "Short description of the issue."},
-                    "ticket_id": {"type": "string", "description": "Optional ticket identifier override."},
-                },
-            },
-            handler=_router_tool,
-        ),
-        AgentTool(
-            name="search_persona_knowledge",
-            description="Retrieve high-confidence knowledge snippets for this persona.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Question or topic to search for."},
-                },
-                "required": ["query"],
-            },
-            handler=_knowledge_tool,
-        ),
-        AgentTool(
-            name="create_support_ticket",
-            description="Escalate to a human agent by creating a GLPI ticket.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "summary": {"type": "string", "description": "Summary included in the ticket."},
-                    "reason": {"type": "string", "description": "Why the escalation is required."},
-                },
-                "required": ["reason"],
-            },
-            handler=_ticket_tool,
-        ),
-        AgentTool(
-            name="retrieve_user_profile",
-            description="Inspect stored CRM attributes for the current user.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "fields": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Optional subset of fields to retrieve.",
-                    }
-                },
-            },
-            handler=_profile_tool,
-        ),
-        AgentTool(
-            name="summarize_recent_history",
-            description="Review the recent conversation transcript for context.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "limit": {
-                        "type": "integer",
-                        "description": "Number of recent lines to return (default 8).",
-                        "minimum": 1,
-                        "maximum": 40,
-                    }
-                },
-            },
-            handler=_history_tool,
-        ),
+        AgentTool(name=name, description=description, parameters=parameters, handler=handlers[name])
+        for name, description, parameters in _SUPPORT_AGENT_TOOL_SPECS
     ]
 
     return tools, tool_state
 
 
+_GLPI_URGENCY_LEVELS = {'low': 1, 'medium': 2, 'high': 3, 'urgent': 4}
+_GLPI_IMPACT_LEVELS = {'single_user': 1, 'multi_user': 2, 'systemwide': 3}
+
+
 def _map_glpi_urgency(value: Optional[str]) -> int:
-    mapping = {
-        'low': 1,
-        'medium': 2,
-        'high': 3,
-        'urgent': 4,
-    }
-    return mapping.get((value or '').lower(), 2)
+    if not value:
+        return 2
+    # Router labels are normally already lower case; only normalize on a miss.
+    return _GLPI_URGENCY_LEVELS.get(value) or _GLPI_URGENCY_LEVELS.get(value.lower(), 2)
 
 
 def _map_glpi_impact(value: Optional[str]) -> int:
-    mapping = {
-        'single_user': 1,
-        'multi_user': 2,
-        'systemwide': 3,
-    }
-    return mapping.get((value or '').lower(), 2)
+    if not value:
+        return 2
+    return _GLPI_IMPACT_LEVELS.get(value) or _GLPI_IMPACT_LEVELS.get(value.lower(), 2)
 
 
 def _format_transcript(
@@ -1554,43 +2717,33 @@ def _format_transcript(
     turns = history[-20:]
     lines = [f"{turn.get('role', 'unknown')}: {turn.get('content', '')}" for turn in turns]
     if latest_user_message:
-        already_has_latest = bool(
-            turns
-            and turns[-1].get("role") == "user"
-            and turns[-1].get("content") == latest_user_message
-        )
-        if not already_has_latest:
+        if not turns or (turns[-1].get("role"), turns[-1].get("content")) != ("user", latest_user_message):
             lines.append(f"user: {latest_user_message}")
     if assistant_reply:
         lines.append(f"assistant: {assistant_reply}")
     return "\n".join(lines)
 
 
-def _ticket_lookup_values(ticket_id: Any) -> List[Any]:
-    if ticket_id is None:
-        return []
-    values: List[Any] = []
-    for candidate in (ticket_id, str(ticket_id)):
-        if candidate not in values:
-            values.append(candidate)
-    if isinstance(ticket_id, str):
-        try:
-            int_candidate = int(ticket_id)
-        except (TypeError, ValueError):
-            int_candidate = None
-        else:
-            if int_candidate not in values:
-                values.append(int_candidate)
-    return values
+@lru_cache(maxsize=4096)
+def _ticket_lookup_values(ticket_id_str: str) -> Tuple[Any, ...]:
+    """Return the string and (when numeric) integer forms a ticket id may be stored as."""
+    try:
+        return (ticket_id_str, int(ticket_id_str))
+    except ValueError:
+        return (ticket_id_str,)
 
 
 def _find_ticket_resolution(ticket_id: Any) -> Optional[Dict[str, Any]]:
-    lookup_values = _ticket_lookup_values(ticket_id)
-    if not lookup_values:
+    if ticket_id is None:
         return None
+    lookup_values = _ticket_lookup_values(str(ticket_id))
     return db[GLPI_RESOLUTIONS_COL].find_one({"ticket_id": {"$in": lookup_values}})
 
 
+# Covers the "%Y-%m-%d[ %H:%M[:%S]]" forms GLPI stores without going through strptime.
+_DT_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?")
+
+
 def _parse_possible_datetime(value: Any) -> Optional[datetime]:
     if isinstance(value, datetime):
         return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -1604,13 +2757,12 @@ def _parse_possible_datetime(value: Any) -> Optional[datetime]:
         except ValueError:
             parsed = None
         if parsed is None:
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
-                try:
-                    parsed = datetime.strptime(text, fmt)
-                    break
-                except ValueError:
-                    parsed = None
-            if parsed is None:
+            match = _DT_RE.fullmatch(text)
+            if not match:
+                return None
+            try:
+                parsed = datetime(*(int(group or 0) for group in match.groups()))
+            except ValueError:
                 return None
         if parsed.tzinfo is None:
             parsed = parsed.replace(tzinfo=timezone.utc)
@@ -1618,14 +2770,34 @@ def _parse_possible_datetime(value: Any) -> Optional[datetime]:
     return None
 
 
+# Every chat message from a user with an open ticket polls its GLPI status, so
+# keep recent answers briefly instead of hitting GLPI once per message.
+_ticket_status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_ticket_status_cache_lock = threading.Lock()
+
+
 def _fetch_glpi_ticket_status(ticket_id: Any) -> Optional[Dict[str, Any]]:
     if not glpi_client or ticket_id is None:
         return None
+    cache_key = str(ticket_id)
+    now = time.monotonic()
+    with _ticket_status_cache_lock:
+        cached = _ticket_status_cache.get(cache_key)
+    if cached and now - cached[0] <= GLPI_TICKET_STATUS_CACHE_TTL_SECONDS:
+        return cached[1]
+    status = _query_glpi_ticket_status(ticket_id)
+    if status is not None and GLPI_TICKET_STATUS_CACHE_TTL_SECONDS > 0:
+        with _ticket_status_cache_lock:
+            if len(_ticket_status_cache) >= GLPI_TICKET_STATUS_CACHE_MAX_ENTRIES:
+                _ticket_status_cache.pop(next(iter(_ticket_status_cache)))
+            _ticket_status_cache[cache_key] = (now, status)
+    return status
+
+
+def _query_glpi_ticket_status(ticket_id: Any) -> Optional[Dict[str, Any]]:
     lookup_id: Any = ticket_id
-    try:
-        lookup_id = int(str(ticket_id))
-    except (TypeError, ValueError):
-        lookup_id = ticket_id
+    if isinstance(ticket_id, str) and ticket_id.isdecimal():
+        lookup_id = int(ticket_id)
     try:
         ticket = glpi_client.get_ticket(lookup_id, include_details=False)
     except Exception as exc:  # pragma: no cover - defensive
@@ -1634,11 +2806,12 @@ def _fetch_glpi_ticket_status(ticket_id: Any) -> Optional[Dict[str, Any]]:
     if not ticket:
         return None
     status_value = ticket.get("status")
-    status_int: Optional[int]
-    try:
-        status_int = int(status_value) if status_value is not None else None
-    except (TypeError, ValueError):
-        status_int = None
+    # GLPI's REST API returns the status as an integer; string forms come from older payloads.
+    status_int: Optional[int] = None
+    if isinstance(status_value, int):
+        status_int = status_value
+    elif isinstance(status_value, str) and status_value.isdecimal():
+        status_int = int(status_value)
     status_text = str(status_value).lower() if status_value is not None else ""
     closed_val = ticket.get("closedate") or ticket.get("solvedate")
     closed_at = _parse_possible_datetime(closed_val)
@@ -1657,11 +2830,17 @@ def _fetch_glpi_ticket_status(ticket_id: Any) -> Optional[Dict[str, Any]]:
     }
 
 
-def _append_ticket_followup(user_id: str, persona_name: str, ticket_id: Any, message: str) -> None:
+def _append_ticket_followup(
+    user_id: str,
+    persona_name: str,
+    ticket_id: Any,
+    message: str,
+    now_ts: Optional[datetime] = None,
+) -> None:
     if ticket_id is None:
         return
     ticket_id_str = str(ticket_id)
-    now_ts = datetime.now(timezone.utc)
+    now_ts = now_ts or datetime.now(timezone.utc)
     update_doc = {
         "$set": {"updated_at": now_ts},
         "$push": {
@@ -1693,19 +2872,13 @@ def _forward_chat_to_ticket(
     if not message_text:
         message_text = "[Customer sent an update without additional text]"
 
-    forwarded = False
-    forward_error: Optional[str] = None
-    if glpi_escalation_manager and ticket_id:
-        try:
-            forwarded = glpi_escalation_manager.send_customer_response(ticket_id, message_text)
-        except Exception as exc:  # pragma: no cover - defensive
-            forward_error = str(exc)
-            logging.error("Failed to forward customer update to GLPI ticket %s: %s", ticket_id, exc)
-
-    _append_ticket_followup(user_id, persona_name, ticket_id, message_text)
-
+    # Neither Mongo write depends on the GLPI result, so both run while GLPI is called.
     now_ts = datetime.now(timezone.utc)
-    db[USER_PROFILES_COL].update_one(
+    followup_write = db_write_executor.submit(
+        _append_ticket_followup, user_id, persona_name, ticket_id, message_text, now_ts
+    )
+    profile_write = db_write_executor.submit(
+        db[USER_PROFILES_COL].update_one,
         {"user_id": user_id},
         {
             "$set": {
@@ -1715,6 +2888,18 @@ def _forward_chat_to_ticket(
         },
         upsert=True,
     )
+
+    forwarded = False
+    forward_error: Optional[str] = None
+    if glpi_escalation_manager and ticket_id:
+        try:
+            forwarded = glpi_escalation_manager.send_customer_response(ticket_id, message_text)
+        except Exception as exc:  # pragma: no cover - defensive
+            forward_error = str(exc)
+            logging.error("Failed to forward customer update to GLPI ticket %s: %s", ticket_id, exc)
+
+    followup_write.result()
+    profile_write.result()
     ticket_entry["last_forwarded_at"] = now_ts
 
     if ticket_id:
@@ -1773,6 +2958,7 @@ def record_escalation_case(
     escalation_reason: Optional[str] = None,
     assistant_reply: Optional[str] = None,
 ):
+    now_ts = datetime.now(timezone.utc)
     transcript = _format_transcript(history, user_message, assistant_reply)
     classification = (router_payload or {}).get("classification", {})
     rag_chunks = (rag_context or {}).get("chunks") or []
@@ -1793,9 +2979,12 @@ def record_escalation_case(
         except Exception as exc:
             logging.error("GLPI escalation ticket failed: %s", exc)
     elif glpi_client:
+        classification_text = orjson.dumps(
+            classification, default=str, option=orjson.OPT_INDENT_2
+        ).decode("utf-8")
         body = (
             f"Persona: {persona_name}\nUser ID: {user_id}\n"
-            f"Router classification: {json.dumps(classification, indent=2)}\n\n"
+            f"Router classification: {classification_text}\n\n"
             f"Conversation transcript (latest first):\n{transcript}"
         )
         payload = {
@@ -1832,10 +3021,11 @@ def record_escalation_case(
             }
             for chunk in rag_chunks
         ],
-        "created_at": datetime.now(timezone.utc),
+        "created_at": now_ts,
     }
-    db[SUPPORT_ESCALATIONS_COL].insert_one(doc)
-    now_ts = datetime.now(timezone.utc)
+    # The escalation record and the profile update hit different collections, so they
+    # can't share a bulk_write; overlap the two round-trips instead.
+    escalation_write = db_write_executor.submit(db[SUPPORT_ESCALATIONS_COL].insert_one, doc)
     active_ticket_doc = {
         "ticket_id": ticket_id_str,
         "status": "open",
@@ -1853,12 +3043,16 @@ def record_escalation_case(
         }
     }
     if ticket_id_str is not None:
+        # Every escalation opens a new GLPI ticket, so the persona's active ticket is
+        # replaced wholesale; $setOnInsert would leave the previous ticket's
+        # opened_at/reason behind on existing profiles.
         profile_update["$set"][f"active_tickets.{persona_name}"] = active_ticket_doc
     db[USER_PROFILES_COL].update_one(
         {"user_id": user_id},
         profile_update,
         upsert=True,
     )
+    escalation_write.result()
     return ticket_id
 
 
@@ -1897,19 +3091,52 @@ def persist_rag_metrics(
 # HEALTH CHECKS
 # ==============================================================================
 _health_cache: Dict[str, Dict[str, Any]] = {}
+_health_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+# One slot per probe so a cold /health waits for the slowest probe, not their sum.
+health_check_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="health")
+
+
+def _fresh_health_result(name: str) -> Optional[Dict[str, Any]]:
+    cache_entry = _health_cache.get(name)
+    if cache_entry is not None and time.monotonic() < cache_entry["expires"]:
+        return dict(cache_entry["result"])
+    return None
+
+
+def _pending_health_result(name: str) -> Dict[str, Any]:
+    cache_entry = _health_cache.get(name)
+    if cache_entry is not None:
+        return dict(cache_entry["result"])
+    return {"status": "pending"}
 
 
 def _cached_health_check(name: str, ttl_seconds: int, check_fn):
-    now = time.time()
-    cache_entry = _health_cache.get(name, {"ts": 0, "result": {}})
-    if now - cache_entry.get("ts", 0) > ttl_seconds:
-        try:
-            result = check_fn()
-        except Exception as exc:  # pragma: no cover - defensive
-            result = {"status": "error", "error": str(exc)}
-        cache_entry = {"ts": now, "result": result}
-        _health_cache[name] = cache_entry
-    return cache_entry["result"]
+    fresh = _fresh_health_result(name)
+    if fresh is not None:
+        return fresh
+    # Probes run under a per-name lock so concurrent /health calls share one refresh
+    # instead of each pinging Mongo/Drive/OpenAI, while a slow Drive probe does not
+    # hold up the Mongo one. Callers that find a refresh already in flight answer
+    # from the expired entry, or "pending" on a cold cache, rather than queueing
+    # behind a probe that may hang.
+    lock = _health_locks[name]
+    if not lock.acquire(blocking=False):
+        return _pending_health_result(name)
+    try:
+        now = time.monotonic()
+        cache_entry = _health_cache.get(name)
+        if cache_entry is None or now >= cache_entry["expires"]:
+            try:
+                result = check_fn()
+            except Exception as exc:  # pragma: no cover - defensive
+                result = {"status": "error", "error": str(exc)}
+            # Jitter the TTL so the probes drift apart instead of expiring together.
+            ttl = ttl_seconds * random.uniform(0.9, 1.1)
+            cache_entry = {"expires": now + ttl, "result": result}
+            _health_cache[name] = cache_entry
+        return dict(cache_entry["result"])
+    finally:
+        lock.release()
 
 
 def _check_mongo():
@@ -1922,7 +3149,7 @@ def _check_mongo():
 
 def _check_drive():
     try:
-        drive_service.files().get(fileId=WATCH_FOLDER_ID, fields="id").execute()
+        get_drive_service().files().get(fileId=WATCH_FOLDER_ID, fields="id").execute()
         return {"status": "ok"}
     except Exception as exc:
         return {"status": "error", "error": str(exc)}
@@ -1954,12 +3181,12 @@ def _serialize_datetime(value: Any) -> Any:
 
 
 def _serialize_queue_item(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Queue documents come straight off a cursor, so the resolution is edited in place.
     resolution = doc.get("resolution") or {}
-    resolution_copy = dict(resolution)
-    closed_at = resolution_copy.get("closed_at")
+    closed_at = resolution.get("closed_at")
     if isinstance(closed_at, datetime):
-        resolution_copy["closed_at"] = closed_at.isoformat()
-    resolution_copy.pop("summary_embedding", None)
+        resolution["closed_at"] = closed_at.isoformat()
+    resolution.pop("summary_embedding", None)
     return {
         "id": str(doc.get("_id")),
         "resolution_id": doc.get("resolution_id"),
@@ -1973,15 +3200,20 @@ def _serialize_queue_item(doc: Dict[str, Any]) -> Dict[str, Any]:
         "approval_mode": doc.get("approval_mode"),
         "approved_by": doc.get("approved_by"),
         "draft": doc.get("draft"),
-        "resolution": resolution_copy,
+        "resolution": resolution,
     }
 
 
+_OBJECT_ID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+
 def _parse_object_id(value: str) -> Optional[ObjectId]:
-    try:
-        return ObjectId(value)
-    except Exception:
+    if isinstance(value, ObjectId):
+        return value
+    # The length test rejects most non-id identifiers (ticket numbers, slugs) before the regex.
+    if not isinstance(value, str) or len(value) != 24 or not _OBJECT_ID_RE.fullmatch(value):
         return None
+    return ObjectId(value)
 
 
 def _serialize_ticket_document(doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -2053,12 +3285,8 @@ def _find_ticket_document(identifier: str) -> Optional[Dict[str, Any]]:
         found = db[SUPPORT_ESCALATIONS_COL].find_one({"_id": doc_id})
         if found:
             return found
-    lookup_values = _ticket_lookup_values(identifier)
-    if lookup_values:
-        found = db[SUPPORT_ESCALATIONS_COL].find_one({"ticket_id": {"$in": lookup_values}})
-        if found:
-            return found
-    return None
+    lookup_values = _ticket_lookup_values(str(identifier))
+    return db[SUPPORT_ESCALATIONS_COL].find_one({"ticket_id": {"$in": lookup_values}})
 
 
 def _serialize_knowledge_article(
@@ -2099,6 +3327,7 @@ def _serialize_knowledge_article(
     return payload
 
 
+@lru_cache(maxsize=256)
 def _normalize_persona_name(value: Optional[str]) -> str:
     persona = (value or DEFAULT_SUPPORT_PERSONA).strip().lower().replace(" ", "_")
     return persona or DEFAULT_SUPPORT_PERSONA
@@ -2224,22 +3453,34 @@ def _persona_collection(persona: str):
     return db[f"{PERSONA_COLLECTION_PREFIX}{persona}"]
 
 
+def _indexed_persona_names(names: Optional[List[str]] = None) -> List[str]:
+    """Return persona slugs from the persona index, optionally limited to ``names``."""
+    query: Dict[str, Any] = {"name": {"$in": names}} if names else {}
+    cursor = db[PERSONA_INDEX_COL].find(query, {"_id": 0, "name": 1}).sort("name", ASCENDING)
+    personas = [doc["name"] for doc in cursor if doc.get("name")]
+    if personas or db[PERSONA_INDEX_COL].estimated_document_count():
+        return personas
+    # The index is seeded in the background after startup; until then fall back to
+    # the persona collections themselves.
+    wanted = set(names or ())
+    return sorted(
+        slug
+        for slug in (
+            name[len(PERSONA_COLLECTION_PREFIX):]
+            for name in db.list_collection_names()
+            if name.startswith(PERSONA_COLLECTION_PREFIX)
+        )
+        if not wanted or slug in wanted
+    )
+
+
 def _list_persona_slugs(filters: Optional[Set[str]] = None) -> List[str]:
+    normalized_filters = sorted(slug for slug in (filters or set()) if slug)
     try:
-        collection_names = db.list_collection_names()
+        return _indexed_persona_names(normalized_filters)
     except Exception as exc:  # pragma: no cover - defensive
-        logging.error("Unable to enumerate persona collections: %s", exc)
+        logging.error("Unable to enumerate personas: %s", exc)
         return []
-    personas: List[str] = []
-    normalized_filters = {slug for slug in (filters or set()) if slug}
-    for name in collection_names:
-        if not name.startswith(PERSONA_COLLECTION_PREFIX):
-            continue
-        slug = name[len(PERSONA_COLLECTION_PREFIX):]
-        if normalized_filters and slug not in normalized_filters:
-            continue
-        personas.append(slug)
-    return sorted(personas)
 
 
 def _collect_glpi_article_summaries(persona: str, limit: int = 200) -> List[Dict[str, Any]]:
@@ -2548,7 +3789,7 @@ def _collect_gdrive_chunks(
             "created_at": _serialize_datetime(doc.get("created_at")),
         }
         if include_embedding:
-            chunk_payload["embedding"] = doc.get("embedding")
+            chunk_payload["embedding"] = resolve_embedding(doc)
         chunks.append(chunk_payload)
 
     return chunks, total
@@ -2558,13 +3799,31 @@ def _collect_gdrive_chunks(
 # ==============================================================================
 @app.route('/health', methods=['GET'])
 def healthcheck():
-    statuses = {
-        "app": {"status": "ok", "time": datetime.now(timezone.utc).isoformat()},
-        "mongo": _cached_health_check("mongo", 30, _check_mongo),
-        "google_drive": _cached_health_check("drive", 60, _check_drive),
-        "openai": _cached_health_check("openai", 60, _check_openai),
+    probes = {
+        "mongo": ("mongo", 30, _check_mongo),
+        "google_drive": ("drive", 60, _check_drive),
+        "openai": ("openai", 60, _check_openai),
+        "glpi": ("glpi", 120, _check_glpi),
     }
-    statuses["glpi"] = _cached_health_check("glpi", 120, _check_glpi)
+    statuses = {"app": {"status": "ok", "time": datetime.now(timezone.utc).isoformat()}}
+    futures = {}
+    for key, probe in probes.items():
+        name = probe[0]
+        # Only probes that actually need a refresh take a pool worker.
+        fresh = _fresh_health_result(name)
+        if fresh is not None:
+            statuses[key] = fresh
+        elif _health_locks[name].locked():
+            statuses[key] = _pending_health_result(name)
+        else:
+            futures[key] = health_check_executor.submit(_cached_health_check, *probe)
+    deadline = time.monotonic() + HEALTH_CHECK_TIMEOUT_SECONDS
+    for key, future in futures.items():
+        try:
+            statuses[key] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            # The probe keeps running and refreshes the cache for the next call.
+            statuses[key] = {"status": "degraded", "reason": "timeout"}
     return jsonify(statuses)
 
 
@@ -3044,9 +4303,11 @@ def knowledge_queue_endpoint():
     query = {"status": status_filter} if status_filter else {}
     cursor = (
         db[KNOWLEDGE_QUEUE_COL]
-        .find(query)
+        .find(query, {"resolution.summary_embedding": 0})
         .sort("updated_at", DESCENDING)
         .limit(limit)
+        # Fetch the whole page in the first reply rather than 101 docs plus a getMore.
+        .batch_size(limit)
     )
     items = [_serialize_queue_item(doc) for doc in cursor]
     return jsonify({"items": items, "auto_approve": KNOWLEDGE_AUTO_APPROVE})
@@ -3085,16 +4346,10 @@ def reject_knowledge_queue_item(item_id: str):
 def list_personas():
     """Return the list of personas currently synced into MongoDB."""
     try:
-        collection_names = db.list_collection_names()
+        personas = _indexed_persona_names()
     except Exception as exc:
-        logging.error(f"Failed to enumerate persona collections: {exc}")
+        logging.error("Failed to enumerate personas: %s", exc)
         return jsonify({"error": "Unable to list personas right now."}), 500
-
-    personas = sorted(
-        name[len(PERSONA_COLLECTION_PREFIX):]
-        for name in collection_names
-        if name.startswith(PERSONA_COLLECTION_PREFIX)
-    )
     return jsonify({"personas": personas})
 
 
@@ -3103,7 +4358,7 @@ def ticket_router_endpoint():
     if not ticket_router:
         return jsonify({"error": "Ticket router not initialized."}), 503
     data = request.get_json() or {}
-    persona = (data.get('persona') or DEFAULT_SUPPORT_PERSONA).lower().replace(' ', '_')
+    persona = _normalize_persona_name(data.get('persona'))
     ticket_text = (data.get('description') or data.get('message') or '').strip()
     if not ticket_text:
         return jsonify({"error": "description is required."}), 400
@@ -3303,7 +4558,7 @@ def escalate_ticket_endpoint(ticket_id: str):
 
     if not doc:
         user_id = (data.get('user_id') or '').strip()
-        persona = (data.get('persona') or DEFAULT_SUPPORT_PERSONA).strip().lower().replace(' ', '_')
+        persona = _normalize_persona_name(data.get('persona'))
         if not user_id:
             return jsonify({"error": "user_id is required when ticket record does not exist"}), 400
         history = data.get('history') if isinstance(data.get('history'), list) else []
@@ -3466,11 +4721,19 @@ def chat_sessions_endpoint():
     ])
 
     sessions_raw = list(db[CHAT_HISTORY_COL].aggregate(pipeline))
+    # One projected query for all listed users instead of a find_one per session row.
+    profiles = {
+        profile.get("user_id"): profile
+        for profile in db[USER_PROFILES_COL].find(
+            {"user_id": {"$in": [row.get('_id') for row in sessions_raw]}},
+            {"_id": 0, "user_id": 1, "tone_observed": 1, "active_tickets": 1, "last_glpi_ticket_id": 1},
+        )
+    }
     sessions: List[Dict[str, Any]] = []
     for row in sessions_raw:
         user = row.get('_id')
         last_ts = _serialize_datetime(row.get('last_message_at'))
-        profile = db[USER_PROFILES_COL].find_one({"user_id": user}, {"_id": 0, "tone_observed": 1, "active_tickets": 1, "last_glpi_ticket_id": 1})
+        profile = profiles.get(user)
         sessions.append(
             {
                 "user_id": user,
@@ -3487,14 +4750,18 @@ def chat_sessions_endpoint():
 
 @app.route('/analytics/trends', methods=['GET'])
 def analytics_trends():
-    clusters = trend_analyzer.list_clusters()
-    for cluster in clusters:
-        if cluster.get('_id'):
-            cluster['_id'] = str(cluster['_id'])
-        ts = cluster.get('last_updated')
-        if isinstance(ts, datetime):
-            cluster['last_updated'] = ts.isoformat()
-    return jsonify({"clusters": clusters})
+    clusters = iter(trend_analyzer.iter_clusters())
+    # Fetch the first batch before the 200 goes out so a failing query still ends in a 500.
+    first = next(clusters, None)
+    items = itertools.chain([first], clusters) if first is not None else iter(())
+    return Response(_stream_json_array("clusters", map(_cluster_payload, items)), mimetype="application/json")
+
+
+def _cluster_payload(cluster: Dict[str, Any]) -> Dict[str, Any]:
+    ts = cluster.get('last_updated')
+    if isinstance(ts, datetime):
+        cluster['last_updated'] = ts.isoformat()
+    return cluster
 
 
 @app.route('/feedback', methods=['POST'])
@@ -3511,20 +4778,185 @@ def metrics_endpoint():
     metrics = feedback_loop.latest_metrics()
     if not metrics:
         metrics = feedback_loop.compute_metrics()
-    if metrics.get('_id'):
-        metrics['_id'] = str(metrics['_id'])
     if metrics.get('timestamp') and isinstance(metrics['timestamp'], datetime):
         metrics['timestamp'] = metrics['timestamp'].isoformat()
     return jsonify(metrics)
 
 
+def _finalize_agent_turn(
+    *,
+    user_id: str,
+    persona_name: str,
+    agent_reply: str,
+    tool_state: Dict[str, Any],
+    conversation_state: Dict[str, Any],
+    assist_attempts: int,
+    ticket_section_closed: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    response_content = (agent_reply or "").strip() or (
+        "I'm still checking on the best next step. Could you confirm any new details in the meantime?"
+    )
+
+    last_rag_context = tool_state["rag_calls"][-1] if tool_state["rag_calls"] else None
+    router_payload = tool_state.get("router") or (
+        tool_state["router_calls"][-1] if tool_state["router_calls"] else None
+    )
+    escalated = bool(conversation_state.get("escalated"))
+    glpi_ticket_id = conversation_state.get("glpi_ticket_id")
+    escalation_reason_text = conversation_state.get("escalation_reason")
+    if glpi_ticket_id:
+        escalated = True
+
+    response_confidence = (last_rag_context or {}).get("confidence") or "LOW"
+    sources: List[Dict[str, Any]] = []
+    if last_rag_context:
+        # Previews are already truncated by the pipeline; only slice raw content when
+        # no preview exists, and never return more sources than the retriever's top_k.
+        sources = [
+            {
+                "id": chunk.get("citation_id") or f"kb_doc_{idx:03d}",
+                "preview": (chunk.get("preview") or (chunk.get("content") or "")[:400]).strip()[:400],
+                "source": chunk.get("source") or (chunk.get("metadata") or {}).get("source_ticket_id"),
+            }
+            for idx, chunk in enumerate((last_rag_context.get("chunks") or [])[:RAG_TOP_K], start=1)
+        ]
+
+    classification = (router_payload or {}).get("classification", {})
+    needs_supervisor = bool(classification.get("needs_supervisor"))
+    router_requests_human = bool(router_payload and router_payload.get("route_to_human"))
+
+    escalation_deferred = False
+    next_attempts = assist_attempts
+
+    if escalated:
+        escalation_deferred = False
+        next_attempts = 0
+    else:
+        if last_rag_context:
+            has_chunks = bool(last_rag_context.get("chunks"))
+            rag_decision = last_rag_context.get("decision")
+            if (
+                (rag_decision == "escalate" or needs_supervisor or router_requests_human)
+                and has_chunks
+                and assist_attempts < MAX_ASSIST_TURNS
+            ):
+                escalation_deferred = True
+                next_attempts = min(MAX_ASSIST_TURNS, assist_attempts + 1)
+            else:
+                if has_chunks and last_rag_context.get("confidence") == "HIGH":
+                    next_attempts = 0
+                elif has_chunks:
+                    next_attempts = min(MAX_ASSIST_TURNS, assist_attempts + 1)
+                else:
+                    next_attempts = 0
+        else:
+            next_attempts = 0
+
+    if last_rag_context:
+        persist_rag_metrics(
+            user_id,
+            persona_name,
+            last_rag_context,
+            escalated,
+            escalation_reason_text,
+        )
+
+    save_message_to_history(user_id, "assistant", response_content)
+    db[USER_PROFILES_COL].update_one(
+        {"user_id": user_id},
+        {
+            "$set": {
+                "last_bot_reply_ms": _now_ms(),
+                "assist_attempts_with_kb": next_attempts,
+            }
+        },
+        upsert=True,
+    )
+
+    payload: Dict[str, Any] = {
+        "message": response_content,
+        "confidence": response_confidence,
+        "escalation_deferred": escalation_deferred,
+        "assist_attempts_with_kb": next_attempts,
+    }
+    if router_payload:
+        payload["router"] = router_payload
+    if glpi_ticket_id:
+        payload["glpi_ticket_id"] = glpi_ticket_id
+    if sources:
+        payload["sources"] = sources
+    if ticket_section_closed:
+        payload["ticket_section_closed"] = ticket_section_closed
+    return payload
+
+
+def _stream_json_array(key: str, items: Iterable[Any]) -> Iterator[bytes]:
+    """Yield ``{"<key>": [...]}`` one encoded item at a time, as jsonify would render it.
+
+    The status line has already been sent by the time a later item fails, so the array is
+    closed and ``"truncated": true`` added instead of leaving the client with broken JSON.
+    """
+    yield b'{"' + key.encode("utf-8") + b'":['
+    separator = b""
+    try:
+        for item in items:
+            yield separator + orjson.dumps(item, default=orjson_default, option=ORJSON_OPTIONS)
+            separator = b","
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.error("Streaming '%s' failed mid-response: %s", key, exc, exc_info=True)
+        yield b'],"truncated":true}\n'
+        return
+    yield b"]}\n"
+
+
+def _sse_frame(payload: Dict[str, Any], event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    # Same compact, unsorted orjson encoding as the regular JSON responses.
+    return f"{prefix}data: {app.json.dumps(payload)}\n\n"
+
+
+def _stream_chat_response(run_turn: Callable[[Optional[Callable[[str], None]]], Dict[str, Any]]) -> Response:
+    """Run a chat turn on the stream executor and relay it as Server-Sent Events.
+
+    Answer tokens are sent as ``data: {"delta": ...}`` frames while the agent replies; the
+    final payload (confidence, sources, ticket state) follows as a ``done`` event.
+    """
+    events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+    def _worker():
+        try:
+            payload = run_turn(lambda text: events.put(("delta", text)))
+        except Exception as exc:
+            logging.error("Error in streamed chat turn: %s", exc, exc_info=True)
+            events.put(("error", {"error": "An internal error occurred."}))
+        else:
+            events.put(("done", payload))
+
+    chat_stream_executor.submit(_worker)
+
+    def _generate():
+        while True:
+            kind, value = events.get()
+            if kind == "delta":
+                yield _sse_frame({"delta": value})
+                continue
+            yield _sse_frame(value, event=kind)
+            return
+
+    return Response(
+        _generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route('/chat', methods=['POST'])
 def chat_handler():
     data = request.get_json() or {}
     raw_persona = (data.get('persona_name') or '').strip()
     if not raw_persona:
         return jsonify({"error": "persona_name is required and must match an ol_* Drive folder."}), 400
-    persona_name = raw_persona.lower().replace(' ', '_')
+    persona_name = _persona_slug(raw_persona)
     if not persona_name.startswith('ol_'):
         return jsonify({"error": "persona_name must start with 'ol_' and match the Drive folder name."}), 400
     user_id = (data.get('user_id') or '').strip()
@@ -3542,26 +4974,22 @@ def chat_handler():
     except Exception:
         pass
 
-    user_profile = db[USER_PROFILES_COL].find_one({"user_id": user_id}) or {}
-    user_profile["user_id"] = user_id
-    user_profile["message_count"] = user_profile.get("message_count", 0) + 1
-
+    profile_update: Dict[str, Any] = {"$inc": {"message_count": 1}}
     try:
         tone_info = infer_conversation_tone(history)
-        db[USER_PROFILES_COL].update_one(
-            {"user_id": user_id},
-            {"$set": {"tone_observed": tone_info.get("tone_observed", "neutral")}},
-            upsert=True
-        )
-        user_profile["tone_observed"] = tone_info.get("tone_observed", "neutral")
+        profile_update["$set"] = {"tone_observed": tone_info.get("tone_observed", "neutral")}
     except Exception:
         pass
 
-    db[USER_PROFILES_COL].update_one(
+    # One round-trip both bumps the counters and returns the profile this turn works from.
+    user_profile = db[USER_PROFILES_COL].find_one_and_update(
         {"user_id": user_id},
-        {"$inc": {"message_count": 1}},
-        upsert=True
-    )
+        profile_update,
+        projection=USER_PROFILE_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    ) or {}
+    user_profile["user_id"] = user_id
 
     active_tickets_raw = user_profile.get("active_tickets")
     active_tickets = active_tickets_raw if isinstance(active_tickets_raw, dict) else {}
@@ -3595,7 +5023,11 @@ def chat_handler():
             }
             if status_info and status_info.get("status") is not None:
                 update_ops["$set"]["last_ticket_status"] = status_info.get("status")
-            db[USER_PROFILES_COL].update_one({"user_id": user_id}, update_ops, upsert=True)
+            # The profile and escalation updates target different collections, so they
+            # run side by side instead of sharing a bulk_write.
+            profile_write = db_write_executor.submit(
+                db[USER_PROFILES_COL].update_one, {"user_id": user_id}, update_ops, upsert=True
+            )
             active_tickets.pop(persona_name, None)
             user_profile["active_tickets"] = active_tickets
             ticket_section_closed = {"ticket_id": str(ticket_id) if ticket_id else None, "notice": notice_message}
@@ -3623,6 +5055,7 @@ def chat_handler():
                     {"user_id": user_id, "persona": persona_name, "ticket_id": str(ticket_id)},
                     escalation_update,
                 )
+            profile_write.result()
         else:
             forwarded_payload = _forward_chat_to_ticket(
                 user_id=user_id,
@@ -3633,9 +5066,9 @@ def chat_handler():
             return jsonify(forwarded_payload), 200
     
     try:
+        # get_persona_context hands back a private copy, so it can be amended in place.
         model_settings, common_phrases = get_persona_context(persona_name)
         if common_phrases:
-            model_settings = dict(model_settings or {})
             model_settings.setdefault("approved_phrases", common_phrases)
 
         assist_attempts = int(user_profile.get("assist_attempts_with_kb", 0))
@@ -3668,123 +5101,44 @@ def chat_handler():
         agent_messages.extend(history)
         agent_messages.append({"role": "user", "content": user_message or ""})
 
-        try:
-            agent_reply, tool_events = run_agentic_session(
-                openai_client,
-                model=CHAT_MODEL,
-                messages=agent_messages,
-                tools=tools,
-                temperature=0.25,
-            )
-        except AgentExecutionError as exc:
-            logging.error("Agentic flow failed: %s", exc)
-            agent_reply = (
-                "I'm sorry—something went wrong while preparing the next steps. "
-                "Let me know if you'd like me to escalate this to a human specialist."
-            )
-            tool_events = []
-
-        response_content = (agent_reply or "").strip() or (
-            "I'm still checking on the best next step. Could you confirm any new details in the meantime?"
-        )
-
-        last_rag_context = tool_state["rag_calls"][-1] if tool_state["rag_calls"] else None
-        router_payload = tool_state.get("router") or (
-            tool_state["router_calls"][-1] if tool_state["router_calls"] else None
-        )
-        escalated = bool(conversation_state.get("escalated"))
-        glpi_ticket_id = conversation_state.get("glpi_ticket_id")
-        escalation_reason_text = conversation_state.get("escalation_reason")
-        if glpi_ticket_id:
-            escalated = True
-
-        response_confidence = (last_rag_context or {}).get("confidence") or "LOW"
-        sources: List[Dict[str, Any]] = []
-        if last_rag_context:
-            for idx, chunk in enumerate(last_rag_context.get("chunks") or [], start=1):
-                preview = (chunk.get("preview") or chunk.get("content") or "").strip()
-                sources.append(
-                    {
-                        "id": chunk.get("citation_id") or f"kb_doc_{idx:03d}",
-                        "preview": preview[:400],
-                        "source": chunk.get("source") or (chunk.get("metadata") or {}).get("source_ticket_id"),
-                    }
+        def _run_turn(on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+            try:
+                agent_reply, _ = run_agentic_session(
+                    openai_client,
+                    model=CHAT_MODEL,
+                    messages=agent_messages,
+                    tools=tools,
+                    functions=_SUPPORT_AGENT_FUNCTIONS,
+                    temperature=0.25,
+                    on_delta=on_delta,
                 )
-
-        classification = (router_payload or {}).get("classification", {})
-        needs_supervisor = bool(classification.get("needs_supervisor"))
-        router_requests_human = bool(router_payload and router_payload.get("route_to_human"))
-
-        escalation_deferred = False
-        next_attempts = assist_attempts
-
-        if escalated:
-            escalation_deferred = False
-            next_attempts = 0
-        else:
-            if last_rag_context:
-                has_chunks = bool(last_rag_context.get("chunks"))
-                rag_decision = last_rag_context.get("decision")
-                if (
-                    (rag_decision == "escalate" or needs_supervisor or router_requests_human)
-                    and has_chunks
-                    and assist_attempts < MAX_ASSIST_TURNS
-                ):
-                    escalation_deferred = True
-                    next_attempts = min(MAX_ASSIST_TURNS, assist_attempts + 1)
-                else:
-                    if has_chunks and last_rag_context.get("confidence") == "HIGH":
-                        next_attempts = 0
-                    elif has_chunks:
-                        next_attempts = min(MAX_ASSIST_TURNS, assist_attempts + 1)
-                    else:
-                        next_attempts = 0
-            else:
-                next_attempts = 0
-
-        if last_rag_context:
-            persist_rag_metrics(
-                user_id,
-                persona_name,
-                last_rag_context,
-                escalated,
-                escalation_reason_text,
+            except AgentExecutionError as exc:
+                logging.error("Agentic flow failed: %s", exc)
+                agent_reply = (
+                    "I'm sorry—something went wrong while preparing the next steps. "
+                    "Let me know if you'd like me to escalate this to a human specialist."
+                )
+            return _finalize_agent_turn(
+                user_id=user_id,
+                persona_name=persona_name,
+                agent_reply=agent_reply,
+                tool_state=tool_state,
+                conversation_state=conversation_state,
+                assist_attempts=assist_attempts,
+                ticket_section_closed=ticket_section_closed,
             )
 
-        save_message_to_history(user_id, "assistant", response_content)
-        db[USER_PROFILES_COL].update_one(
-            {"user_id": user_id},
-            {
-                "$set": {
-                    "last_bot_reply": datetime.now(timezone.utc),
-                    "assist_attempts_with_kb": next_attempts,
-                }
-            },
-            upsert=True,
-        )
-
-        payload: Dict[str, Any] = {
-            "message": response_content,
-            "confidence": response_confidence,
-            "escalation_deferred": escalation_deferred,
-            "assist_attempts_with_kb": next_attempts,
-        }
-        if router_payload:
-            payload["router"] = router_payload
-        if glpi_ticket_id:
-            payload["glpi_ticket_id"] = glpi_ticket_id
-        if sources:
-            payload["sources"] = sources
-        if ticket_section_closed:
-            payload["ticket_section_closed"] = ticket_section_closed
-        return jsonify(payload), 200
+        if data.get("stream"):
+            return _stream_chat_response(_run_turn)
+        return jsonify(_run_turn()), 200
 
     except Exception as e:
-        logging.error(f"Error in chat handler: {e}", exc_info=True)
+        logging.error("Error in chat handler: %s", e, exc_info=True)
         return jsonify({"error": "An internal error occurred."}), 500
 
 
 if __name__ == "__main__":
     if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        _ensure_indexes_started()
         start_background_threads()
     app.run(host="0.0.0.0", port=8001, debug=True)
@@ -1,10 +1,11 @@
 """Agent tool framework for orchestrating LLM tool calls."""
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import orjson
+
 
 @dataclass
 class AgentTool:
@@ -30,6 +31,35 @@ class AgentExecutionError(RuntimeError):
     pass
 
 
+def _stream_completion(
+    openai_client,
+    on_delta: Callable[[str], None],
+    **request_kwargs: Any,
+) -> Tuple[str, Optional[Dict[str, str]]]:
+    """Consume a streamed completion, forwarding content deltas as they arrive.
+
+    Returns the accumulated content and the function call (if any) requested by the model.
+    """
+
+    content_parts: List[str] = []
+    function_name = ""
+    argument_parts: List[str] = []
+    for chunk in openai_client.chat.completions.create(stream=True, **request_kwargs):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.function_call:
+            function_name += delta.function_call.name or ""
+            argument_parts.append(delta.function_call.arguments or "")
+        elif delta.content:
+            content_parts.append(delta.content)
+            on_delta(delta.content)
+    function_call = None
+    if function_name:
+        function_call = {"name": function_name, "arguments": "".join(argument_parts)}
+    return "".join(content_parts), function_call
+
+
 def run_agentic_session(
     openai_client,
     *,
@@ -38,9 +68,17 @@ def run_agentic_session(
     tools: List[AgentTool],
     temperature: float = 0.2,
     max_iterations: int = 6,
+    on_delta: Optional[Callable[[str], None]] = None,
+    functions: Optional[List[Dict[str, Any]]] = None,
 ) -> Tuple[str, List[Dict[str, Any]]]:
     """Execute an agent loop with function-calling tools.
 
+    When ``on_delta`` is given, completions are streamed and answer text is passed to it
+    token by token while the full reply is still accumulated and returned.
+
+    ``functions`` may carry the tools' schemas prebuilt by a caller whose tool set is
+    fixed; otherwise they are built from ``tools``.
+
     Returns the final assistant content and the list of tool interactions.
     """
 
@@ -48,26 +86,38 @@ def run_agentic_session(
         raise ValueError("Agent session requires at least one tool.")
 
     tool_lookup = {tool.name: tool for tool in tools}
-    functions = [tool.schema() for tool in tools]
+    if functions is None:
+        functions = [tool.schema() for tool in tools]
     tool_events: List[Dict[str, Any]] = []
 
     for iteration in range(max_iterations):
-        response = openai_client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            messages=messages,
-            functions=functions,
-            function_call="auto",
-        )
-        choice = response.choices[0].message
-        if choice.function_call:
-            tool_name = choice.function_call.name
+        request_kwargs = {
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "functions": functions,
+            "function_call": "auto",
+        }
+        if on_delta:
+            content, function_call = _stream_completion(openai_client, on_delta, **request_kwargs)
+        else:
+            choice = openai_client.chat.completions.create(**request_kwargs).choices[0].message
+            content = choice.content
+            function_call = None
+            if choice.function_call:
+                function_call = {
+                    "name": choice.function_call.name,
+                    "arguments": choice.function_call.arguments,
+                }
+        if function_call:
+            tool_name = function_call["name"]
             tool = tool_lookup.get(tool_name)
             if not tool:
                 raise AgentExecutionError(f"LLM requested unknown tool '{tool_name}'")
+            raw_arguments = function_call["arguments"] or "{}"
             try:
-                arguments = json.loads(choice.function_call.arguments or "{}")
-            except json.JSONDecodeError as exc:  # pragma: no cover - defensive
+                arguments = orjson.loads(raw_arguments)
+            except orjson.JSONDecodeError as exc:  # pragma: no cover - defensive
                 raise AgentExecutionError(
                     f"Invalid JSON arguments for tool '{tool_name}': {exc}"
                 ) from exc
@@ -82,19 +132,17 @@ def run_agentic_session(
             messages.append({
                 "role": "assistant",
                 "content": None,
-                "function_call": {
-                    "name": tool_name,
-                    "arguments": json.dumps(arguments, ensure_ascii=False),
-                },
+                # Echo the model's own argument string back instead of re-encoding it.
+                "function_call": {"name": tool_name, "arguments": raw_arguments},
             })
             messages.append({
                 "role": "function",
                 "name": tool_name,
-                "content": json.dumps(result, ensure_ascii=False),
+                "content": orjson.dumps(result, default=str).decode("utf-8"),
             })
             continue
 
-        final_text = choice.content or ""
+        final_text = content or ""
         messages.append({"role": "assistant", "content": final_text})
         return final_text, tool_events
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 import logging
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 import numpy as np
 from sklearn.cluster import MiniBatchKMeans
@@ -110,4 +110,8 @@ class TrendAnalyzer:
         return results
 
     def list_clusters(self) -> List[Dict[str, Any]]:
-        return list(self.db[self.cluster_collection].find().sort("size", -1))
+        return list(self.iter_clusters())
+
+    def iter_clusters(self) -> Iterator[Dict[str, Any]]:
+        """Return a cursor over the stored clusters, largest first."""
+        return self.db[self.cluster_collection].find().sort("size", -1)
@@ -4,6 +4,38 @@ import os
 import re
 from typing import Any, Dict, Iterable, List, Optional
 
+import orjson
+
+_PHONE_STRIP_RE = re.compile(r"[^0-9+]+")
+
+
+def _coerce_number(raw: str) -> Any:
+    try:
+        return int(raw)
+    except ValueError:
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+
+
+def _safe_json_loads(raw: str) -> Any:
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return raw
+
+
+# Normalizer name -> function applied to the stripped string value.
+_NORMALIZERS = {
+    "email": str.lower,
+    "phone": lambda raw: _PHONE_STRIP_RE.sub("", raw),
+    "lowercase": str.lower,
+    "titlecase": str.title,
+    "number": _coerce_number,
+    "json": _safe_json_loads,
+}
+
 
 def _iterable(items: Any) -> Iterable[Any]:
     if items is None:
@@ -58,6 +90,7 @@ class CRMEnrichmentConfig:
                     seen.add(key)
                     ordered.append(key)
             self.memory_priority = ordered
+        self._field_name_set = frozenset(self.field_names)
 
     @staticmethod
     def _coerce_field(entry: Any) -> Optional[Dict[str, Any]]:
@@ -76,7 +109,7 @@ class CRMEnrichmentConfig:
             return {}
         normalized: Dict[str, Any] = {}
         for key, value in payload.items():
-            if key not in self.field_names:
+            if key not in self._field_name_set:
                 continue
             cleaned_value = self._normalize_value(key, value)
             if cleaned_value not in (None, ""):
@@ -86,37 +119,13 @@ class CRMEnrichmentConfig:
     def _normalize_value(self, key: str, value: Any) -> Any:
         if value is None:
             return None
-        normalizer = self.normalizers.get(key)
-        if isinstance(value, str):
-            raw = value.strip()
-        else:
-            raw = value
-
-        if raw in (None, ""):
+        if not isinstance(value, str):
+            return value
+        raw = value.strip()
+        if not raw:
             return None
-
-        if normalizer == "email" and isinstance(raw, str):
-            return raw.lower()
-        if normalizer == "phone" and isinstance(raw, str):
-            return re.sub(r"[^0-9+]+", "", raw)
-        if normalizer == "lowercase" and isinstance(raw, str):
-            return raw.lower()
-        if normalizer == "titlecase" and isinstance(raw, str):
-            return raw.title()
-        if normalizer == "number" and isinstance(raw, str):
-            try:
-                return int(raw)
-            except ValueError:
-                try:
-                    return float(raw)
-                except ValueError:
-                    return raw
-        if normalizer == "json" and isinstance(raw, str):
-            try:
-                return json.loads(raw)
-            except json.JSONDecodeError:
-                return raw
-        return raw
+        normalizer = _NORMALIZERS.get(self.normalizers.get(key))
+        return normalizer(raw) if normalizer else raw
 
 
 def load_crm_enrichment_config(path: Optional[str]) -> CRMEnrichmentConfig:
@@ -6,17 +6,20 @@ It then performs intelligent chunking that respects document hierarchy.
 """
 from __future__ import annotations
 
+import hashlib
 import io
 import logging
-import tempfile
+import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.base_models import InputFormat
+from docling.datamodel.base_models import DocumentStream, InputFormat
 from docling.datamodel.pipeline_options import PdfPipelineOptions
 from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
+from docling_core.types.doc import DoclingDocument
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,8 @@ class DoclingConverter:
         max_chunk_tokens: int = 512,
         preserve_tables: bool = True,
         preserve_formatting: bool = True,
+        max_concurrent_conversions: int = 1,
+        cache_dir: Optional[str] = None,
     ):
         """Initialize the Docling converter.
         
@@ -47,10 +52,18 @@ class DoclingConverter:
             max_chunk_tokens: Maximum tokens per chunk (approximate)
             preserve_tables: Whether to keep tables intact as single chunks
             preserve_formatting: Whether to preserve formatting metadata
+            max_concurrent_conversions: Conversions allowed to run at once when
+                the converter is shared between threads
+            cache_dir: Directory for converted documents keyed by content hash;
+                caching is disabled when empty
         """
         self.max_chunk_tokens = max_chunk_tokens
         self.preserve_tables = preserve_tables
         self.preserve_formatting = preserve_formatting
+        self._conversion_slots = threading.BoundedSemaphore(max(1, max_concurrent_conversions))
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Configure Docling pipeline for high-quality extraction
         pipeline_options = PdfPipelineOptions()
@@ -66,6 +79,14 @@ class DoclingConverter:
             }
         )
         
+    def warm_up(self) -> None:
+        """Load the PDF pipeline models ahead of the first conversion."""
+        try:
+            with self._conversion_slots:
+                self.converter.initialize_pipeline(InputFormat.PDF)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Docling warm-up failed: %s", exc)
+    
     def convert_bytes_to_docling(
         self,
         file_bytes: bytes,
@@ -74,6 +95,9 @@ class DoclingConverter:
     ) -> Optional[Any]:
         """Convert raw file bytes to a Docling document.
         
+        The bytes are handed to the shared converter as an in-memory stream,
+        so no temporary file is written.
+        
         Args:
             file_bytes: Raw bytes of the document
             mime_type: MIME type of the document
@@ -85,29 +109,77 @@ class DoclingConverter:
         if not file_bytes:
             logger.warning("Empty file bytes provided for %s", filename)
             return None
+        content_hash = hashlib.sha256(file_bytes).hexdigest() if self.cache_dir else None
+        stream = DocumentStream(name=Path(filename).name, stream=io.BytesIO(file_bytes))
+        return self._convert(stream, filename, content_hash)
+    
+    @staticmethod
+    def file_sha256(file_path: str | Path) -> str:
+        """Return the SHA-256 hex digest of a file, read in 1 MiB blocks."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def convert_file_to_docling(
+        self,
+        file_path: str | Path,
+        filename: str,
+        content_hash: Optional[str] = None,
+    ) -> Optional[Any]:
+        """Convert a document that is already on disk to a Docling document.
+        
+        When a cache directory is configured, conversions are stored as Docling
+        JSON keyed by content hash and reused for unchanged files.
+        
+        Args:
+            file_path: Path to the document; its suffix drives format detection
+            filename: Original filename (used for logging)
+            content_hash: Precomputed SHA-256 of the file, if already known
             
-        # Docling works best with files, so we'll use a temporary file
+        Returns:
+            Docling document object or None if conversion fails
+        """
+        if self.cache_dir and not content_hash:
+            content_hash = self.file_sha256(file_path)
+        return self._convert(Path(file_path), filename, content_hash)
+    
+    def _convert(self, source: Any, filename: str, content_hash: Optional[str]) -> Optional[Any]:
+        cache_path = None
+        if self.cache_dir and content_hash:
+            cache_path = self.cache_dir / f"{content_hash}.json"
+            cached = self._load_cached_document(cache_path)
+            if cached is not None:
+                logger.info("Reusing cached Docling conversion for %s", filename)
+                return cached
         try:
-            with tempfile.NamedTemporaryFile(suffix=Path(filename).suffix, delete=False) as tmp_file:
-                tmp_file.write(file_bytes)
-                tmp_path = tmp_file.name
-            
-            # Convert the document
-            result = self.converter.convert(tmp_path)
-            
-            # Clean up temp file
-            Path(tmp_path).unlink(missing_ok=True)
-            
-            return result.document
-            
+            with self._conversion_slots:
+                result = self.converter.convert(source)
         except Exception as exc:
             logger.error("Failed to convert %s with Docling: %s", filename, exc)
-            # Clean up temp file on error
-            try:
-                Path(tmp_path).unlink(missing_ok=True)
-            except Exception:
-                pass
             return None
+        if cache_path is not None:
+            self._store_cached_document(cache_path, result.document)
+        return result.document
+    
+    def _load_cached_document(self, cache_path: Path) -> Optional[Any]:
+        if not cache_path.exists():
+            return None
+        try:
+            return DoclingDocument.model_validate_json(cache_path.read_text(encoding="utf-8"))
+        except Exception as exc:
+            logger.warning("Ignoring unreadable Docling cache entry %s: %s", cache_path.name, exc)
+            return None
+    
+    def _store_cached_document(self, cache_path: Path, document: Any) -> None:
+        tmp_path = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_text(document.model_dump_json(), encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Unable to cache Docling conversion %s: %s", cache_path.name, exc)
+            tmp_path.unlink(missing_ok=True)
     
     def extract_text_from_docling(self, docling_doc: Any) -> str:
         """Extract plain text from a Docling document.
@@ -256,7 +328,10 @@ class DoclingConverter:
             if hasattr(page, 'elements'):
                 has_elements = True
                 elements = page.elements
-                logger.debug("Page %d has %d elements", page_num, len(list(elements)) if hasattr(elements, '__iter__') else 0)
+                if logger.isEnabledFor(logging.DEBUG):
+                    # Only materialise the elements for the count when debug output is on.
+                    elements = list(elements) if hasattr(elements, '__iter__') else []
+                    logger.debug("Page %d has %d elements", page_num, len(elements))
                 
                 for elem_idx, element in enumerate(elements):
                     chunk_data = self._process_element(
@@ -535,6 +610,8 @@ def create_docling_converter(
     max_chunk_tokens: int = 512,
     preserve_tables: bool = True,
     preserve_formatting: bool = True,
+    max_concurrent_conversions: int = 1,
+    cache_dir: Optional[str] = None,
 ) -> DoclingConverter:
     """Factory function to create a DoclingConverter instance.
     
@@ -542,6 +619,8 @@ def create_docling_converter(
         max_chunk_tokens: Maximum tokens per chunk (approximate)
         preserve_tables: Whether to keep tables intact as single chunks
         preserve_formatting: Whether to preserve formatting metadata
+        max_concurrent_conversions: Conversions allowed to run at once
+        cache_dir: Directory for content-hash keyed conversion cache
         
     Returns:
         Configured DoclingConverter instance
@@ -550,4 +629,6 @@ def create_docling_converter(
         max_chunk_tokens=max_chunk_tokens,
         preserve_tables=preserve_tables,
         preserve_formatting=preserve_formatting,
+        max_concurrent_conversions=max_concurrent_conversions,
+        cache_dir=cache_dir,
     )
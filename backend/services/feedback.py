@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
@@ -20,6 +21,8 @@ class FeedbackLoop:
         self.db = db
         self.feedback_collection = feedback_collection
         self.metrics_collection = metrics_collection
+        # Set on new feedback so metrics are recomputed without waiting a full refresh interval.
+        self.work_event = threading.Event()
 
     # ------------------------------------------------------------------
     def record_feedback(self, payload: Dict[str, Any]) -> str:
@@ -32,6 +35,7 @@ class FeedbackLoop:
             "created_at": datetime.now(timezone.utc),
         }
         result = self.db[self.feedback_collection].insert_one(doc)
+        self.work_event.set()
         return str(result.inserted_id)
 
     def compute_metrics(self) -> Dict[str, Any]:
@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 import logging
 import re
+import threading
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -64,6 +65,8 @@ class KnowledgePipeline:
         self._embedding_fn = embedding_fn
         self.queue_collection = queue_collection
         self.auto_approve = auto_approve
+        # Set whenever a resolution is queued so the worker can wake before its poll timeout.
+        self.work_event = threading.Event()
         self._cleanup_legacy_chunks()
 
     def _cleanup_legacy_chunks(self) -> None:
@@ -266,6 +269,7 @@ class KnowledgePipeline:
             {"$set": payload},
             upsert=True,
         )
+        self.work_event.set()
 
     # ------------------------------------------------------------------
     def process_next(self) -> bool:
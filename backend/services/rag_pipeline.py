@@ -11,7 +11,7 @@ from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 
-from .rag_utils import extract_query_terms, stream_article_chunks, stream_manual_chunks
+from .rag_utils import extract_query_terms, has_embedding, stream_article_chunks, stream_manual_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -138,21 +138,29 @@ class SemanticRetriever:
     def __init__(self, embedding_fn) -> None:
         self._embedding_fn = embedding_fn
 
-    def rank(self, query: str, candidates: Sequence[Dict[str, Any]], top_k: int) -> List[Tuple[str, float]]:
+    def rank(
+        self,
+        query: str,
+        candidates: Sequence[Dict[str, Any]],
+        top_k: int,
+        query_embedding: Optional[Sequence[float]] = None,
+    ) -> List[Tuple[str, float]]:
         if not query.strip():
             return []
-        embeddings = self._embedding_fn([query])
-        if not embeddings:
-            return []
-        query_vec = np.array(embeddings[0])
+        if query_embedding is None:
+            embeddings = self._embedding_fn([query])
+            if not embeddings:
+                return []
+            query_embedding = embeddings[0]
+        query_vec = np.array(query_embedding)
         query_norm = np.linalg.norm(query_vec) or 1.0
         query_unit = query_vec / query_norm
         scored: List[Tuple[str, float]] = []
         for cand in candidates:
             embedding = cand.get("embedding")
-            if not embedding:
+            if not has_embedding(embedding):
                 continue
-            cand_vec = np.array(embedding)
+            cand_vec = np.asarray(embedding)
             denom = np.linalg.norm(cand_vec) or 1.0
             similarity = float(np.dot(query_unit, cand_vec / denom))
             scored.append((cand["doc_id"], similarity))
@@ -187,7 +195,12 @@ class HybridRAGPipeline:
         self._semantic = SemanticRetriever(self.embedding_fn)
 
     # ------------------------------------------------------------------
-    def build_context(self, persona: str, query: str) -> Dict[str, Any]:
+    def build_context(
+        self,
+        persona: str,
+        query: str,
+        precomputed_embedding: Optional[List[float]] = None,
+    ) -> Dict[str, Any]:
         persona_slug = persona.lower().replace(" ", "_")
         collection = self.db[f"{self.persona_prefix}{persona_slug}"]
         candidates = self._collect_candidates(collection)
@@ -202,7 +215,9 @@ class HybridRAGPipeline:
             }
         query_terms = extract_query_terms(query) or _tokenize(query)
         bm25_ranked = self._bm25.rank(query_terms, candidates, self.top_k)
-        semantic_ranked = self._semantic.rank(query, candidates, self.top_k)
+        semantic_ranked = self._semantic.rank(
+            query, candidates, self.top_k, query_embedding=precomputed_embedding
+        )
         fused_chunks = self._fuse_results(bm25_ranked, semantic_ranked, candidates)
         metrics = self._build_metrics(fused_chunks, bm25_ranked, semantic_ranked)
         validation = self._run_validation(query, fused_chunks, metrics)
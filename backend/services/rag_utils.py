@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, Iterator, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from bson import Binary
 
 COMMON_STOPWORDS: Set[str] = {
     "the",
@@ -54,10 +57,47 @@ def extract_query_terms(text: Optional[str], limit: int = 6, stopwords: Optional
     return terms
 
 
+def quantize_embedding(embedding: Sequence[float]) -> Dict[str, Any]:
+    """Pack a float embedding as int8 bytes with a per-vector scale (4x smaller in BSON)."""
+    vec = np.asarray(embedding, dtype=np.float32)
+    peak = float(np.abs(vec).max()) if vec.size else 0.0
+    scale = peak / 127.0 if peak else 1.0
+    quantized = np.round(vec / scale).astype(np.int8)
+    return {"embedding_q": Binary(quantized.tobytes()), "embedding_scale": scale}
+
+
+def embedding_storage_fields(embedding: Optional[Any], store_int8: bool) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Return ($set, $unset) fields for storing an embedding, int8-packed when ``store_int8``.
+
+    Vectors reused from int8 storage come back from ``resolve_embedding`` as numpy arrays,
+    which BSON cannot encode, so float storage always writes a plain list.
+    """
+    if embedding is not None and len(embedding) and store_int8:
+        return quantize_embedding(embedding), {"embedding": ""}
+    if isinstance(embedding, np.ndarray):
+        embedding = embedding.tolist()
+    return {"embedding": embedding}, {"embedding_q": "", "embedding_scale": ""}
+
+
+def resolve_embedding(doc: Dict[str, Any]) -> Optional[Any]:
+    """Return a document's embedding, dequantizing ``embedding_q`` when no float vector is stored."""
+    embedding = doc.get("embedding")
+    if embedding is not None and len(embedding):
+        return embedding
+    packed = doc.get("embedding_q")
+    if not packed:
+        return None
+    return np.frombuffer(bytes(packed), dtype=np.int8).astype(np.float32) * float(doc.get("embedding_scale") or 1.0)
+
+
+def has_embedding(embedding: Optional[Any]) -> bool:
+    return embedding is not None and len(embedding) > 0
+
+
 def manual_doc_to_chunk(doc: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "content": doc.get("content"),
-        "embedding": doc.get("embedding"),
+        "embedding": resolve_embedding(doc),
         "tags": doc.get("tags") or [],
         "doc_id": str(doc.get("_id")) if doc.get("_id") else None,
         "approved_at": doc.get("approved_at"),
@@ -78,7 +118,7 @@ def iter_article_chunks(article_doc: Dict[str, Any]) -> Iterator[Dict[str, Any]]
             continue
         yield {
             "content": content,
-            "embedding": chunk.get("embedding"),
+            "embedding": resolve_embedding(chunk),
             "chunk_index": chunk.get("chunk_index"),
             "article_id": str(article_id) if article_id else None,
             "tags": tags,
@@ -95,7 +135,7 @@ def stream_manual_chunks(cursor, require_embedding: bool = False) -> Iterator[Di
         embedding = chunk.get("embedding")
         if not content:
             continue
-        if require_embedding and not embedding:
+        if require_embedding and not has_embedding(embedding):
             continue
         yield chunk
 
@@ -107,6 +147,6 @@ def stream_article_chunks(cursor, require_embedding: bool = False) -> Iterator[D
             embedding = chunk.get("embedding")
             if not content:
                 continue
-            if require_embedding and not embedding:
+            if require_embedding and not has_embedding(embedding):
                 continue
             yield chunk
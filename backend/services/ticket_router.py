@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional
 
 import numpy as np
 
-from services.rag_utils import extract_query_terms, stream_article_chunks, stream_manual_chunks
+from services.rag_utils import extract_query_terms, has_embedding, stream_article_chunks, stream_manual_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +65,10 @@ class TicketRouter:
         collection = self._persona_collection(persona)
         results: List[Dict[str, Any]] = []
         manual_cursor = (
-            collection.find({"doc_type": "knowledge", "embedding": {"$exists": True}})
+            collection.find({
+                "doc_type": "knowledge",
+                "$or": [{"embedding": {"$exists": True}}, {"embedding_q": {"$exists": True}}],
+            })
             .limit(self.max_docs_to_score)
         )
         for chunk in stream_manual_chunks(manual_cursor, require_embedding=True):
@@ -93,7 +96,7 @@ class TicketRouter:
         scored: List[Dict[str, Any]] = []
         for chunk in chunks:
             embedding = chunk.get("embedding")
-            if not embedding:
+            if not has_embedding(embedding):
                 continue
             scored.append(
                 {
@@ -139,10 +142,14 @@ class TicketRouter:
         ticket_text: str,
         ticket_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
+        precomputed_embedding: Optional[List[float]] = None,
     ) -> Dict[str, Any]:
         persona_slug = persona.lower().replace(" ", "_")
         classification = self.classify(ticket_text, metadata) or {}
-        embedding = self._embedding_fn([ticket_text])[0]
+        if precomputed_embedding is not None:
+            embedding = precomputed_embedding
+        else:
+            embedding = self._embedding_fn([ticket_text])[0]
         query_terms = extract_query_terms(ticket_text)
         matches = self._top_knowledge_matches(persona_slug, embedding, query_terms)
         top_score = matches[0]["similarity"] if matches else 0.0
@@ -0,0 +1,32 @@
+import bson
+import numpy as np
+
+from services.rag_utils import embedding_storage_fields, quantize_embedding, resolve_embedding
+
+
+def test_float_storage_of_int8_stored_embedding_is_bson_encodable():
+    # Chunks stored while EMBEDDING_STORE_INT8 was on, reused after switching it off.
+    stored = quantize_embedding([0.5, -0.25, 1.0])
+    reused = resolve_embedding(stored)
+    assert isinstance(reused, np.ndarray)
+
+    embedding_set, embedding_unset = embedding_storage_fields(reused, store_int8=False)
+
+    assert isinstance(embedding_set["embedding"], list)
+    assert embedding_set["embedding"] == reused.tolist()
+    assert embedding_unset == {"embedding_q": "", "embedding_scale": ""}
+    bson.encode(embedding_set)
+
+
+def test_int8_storage_packs_the_vector():
+    embedding_set, embedding_unset = embedding_storage_fields([0.5, -0.25, 1.0], store_int8=True)
+
+    assert set(embedding_set) == {"embedding_q", "embedding_scale"}
+    assert embedding_unset == {"embedding": ""}
+    bson.encode(embedding_set)
+
+
+def test_missing_embedding_is_stored_as_none():
+    embedding_set, _ = embedding_storage_fields(None, store_int8=True)
+
+    assert embedding_set == {"embedding": None}